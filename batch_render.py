@@ -0,0 +1,102 @@
+# Headless batch renderer: reads equations from a CSV with the same columns as
+# equation_history.csv and renders each one to PNG/SVG across a process pool.
+#
+#   python batch_render.py equation_history.csv --out renders --format svg --workers 8
+import os
+import re
+import sys
+import csv
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from grapher_core import ExpressionCache, render_equation
+
+_cache = None
+
+def _init_worker():
+    # One expression cache per worker process, so repeated equations compile once per worker
+    global _cache
+    _cache = ExpressionCache()
+
+def _slug(equation):
+    return re.sub(r'[^A-Za-z0-9]+', '_', equation).strip('_')[:40] or 'equation'
+
+def render_item(item, out_dir, fmt, dark, dpi):
+    start = time.perf_counter()
+    path = os.path.join(out_dir, f"{item['index']:05d}_{_slug(item['equation'])}.{fmt}")
+    result = {"index": item["index"], "equation": item["equation"], "path": path, "error": "", "points": 0}
+    try:
+        result["points"] = render_equation(item["equation"], item["min_x"], item["max_x"], item["color"], path,
+                                           cache=_cache, dark=dark, dpi=dpi)
+    except Exception as e:
+        result["path"] = ""
+        result["error"] = f"{type(e).__name__}: {' '.join(str(e).split())}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def read_items(path):
+    items = []
+    with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+        for i, row in enumerate(csv.DictReader(csvfile)):
+            item = {"index": i, "equation": row.get('equation', ''), "color": row.get('color') or '#6a11cb',
+                    "min_x": row.get('min_x', -10), "max_x": row.get('max_x', 10)}
+            try:
+                item["min_x"] = float(item["min_x"])
+                item["max_x"] = float(item["max_x"])
+            except ValueError:
+                item["min_x"] = item["max_x"] = None
+            items.append(item)
+    return items
+
+def run_batch(items, out_dir, fmt="png", workers=None, dark=True, dpi=100):
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    todo = []
+    for item in items:
+        if item["min_x"] is None:
+            results.append({"index": item["index"], "equation": item["equation"], "path": "", "points": 0,
+                            "seconds": 0.0, "error": "Min X and Max X must be valid numbers"})
+        else:
+            todo.append(item)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(render_item, item, out_dir, fmt, dark, dpi) for item in todo]
+        for future in as_completed(futures):
+            results.append(future.result())
+    elapsed = time.perf_counter() - start
+    results.sort(key=lambda r: r["index"])
+    ok = sum(1 for r in results if not r["error"])
+    stats = {"total": len(results), "ok": ok, "failed": len(results) - ok, "seconds": elapsed,
+             "per_second": ok / elapsed if elapsed > 0 else 0.0}
+    return results, stats
+
+def write_report(results, path):
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=['index', 'equation', 'path', 'points', 'seconds', 'error'])
+        writer.writeheader()
+        writer.writerows(results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render equations from a history CSV without a display.")
+    parser.add_argument("input", help="CSV with equation, min_x, max_x, color columns")
+    parser.add_argument("--out", default="renders", help="output directory (default: renders)")
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--theme", choices=["dark", "light"], default="dark")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--report", help="write per-item results to this CSV")
+    args = parser.parse_args(argv)
+
+    results, stats = run_batch(read_items(args.input), args.out, fmt=args.format, workers=args.workers,
+                               dark=(args.theme == "dark"), dpi=args.dpi)
+    for r in results:
+        if r["error"]:
+            print(f"[{r['index']}] {r['equation']!r}: {r['error']}", file=sys.stderr)
+    if args.report:
+        write_report(results, args.report)
+    print(f"Rendered {stats['ok']}/{stats['total']} equations in {stats['seconds']:.2f}s "
+          f"({stats['per_second']:.1f} equations/sec), {stats['failed']} failed")
+    return 1 if stats["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
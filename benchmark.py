@@ -0,0 +1,195 @@
+# Headless benchmark of the plot pipeline and history I/O (Agg canvas, no display needed).
+# Each stage is timed separately over a corpus of expressions and a range of sizes, and the
+# results are written as JSON. --compare flags stages that got slower than a saved baseline.
+#
+#   python benchmark.py --out baseline.json
+#   python benchmark.py --out current.json --compare baseline.json
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import platform
+import argparse
+import statistics
+import importlib.util
+from datetime import datetime
+import numpy as np
+from grapher_core import normalize_equation, store_real, style_axes, label_axes
+from history_store import HistoryStore
+from history_export import export_store
+
+CORPUS = {
+    "poly-quintic": "x^5 - 3*x^3 + 2*x - 7",
+    "poly-quadratic": "3*x^2 + 2*x + 1",
+    "trig-tan": "tan(x)",
+    "trig-csc": "1/sin(x)",
+    "nested-explog": "exp(log(abs(x) + 1)*sin(x))",
+    "nested-softplus": "log(exp(x/5) + 1)",
+    "piecewise": "Piecewise((x^2, x < 0), (sin(x), x < 5), (1/x, True))",
+    "piecewise-floor": "Abs(x) + floor(x)",
+}
+SAMPLE_SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+HISTORY_SIZES = [10, 100, 1000, 10**4, 10**5]
+QUICK_SAMPLE_SIZES = [10**3, 10**5]
+QUICK_HISTORY_SIZES = [10, 1000]
+
+def measure(fn, repeats, setup=None):
+    times = []
+    for _ in range(repeats):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state)
+        times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": statistics.median(times), "repeats": repeats}
+
+def bench_pipeline(results, sizes, repeats, skip_draw_above):
+    import sympy as sp
+    from sympy.core.cache import clear_cache
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    x = sp.symbols('x')
+    for case, equation in CORPUS.items():
+        key = normalize_equation(equation)
+        def sympify(_):
+            sp.sympify(key)
+        # sympy memoizes internally, so clear its cache to time a cold parse
+        results.append({"stage": "sympify", "case": case, "size": 0, **measure(sympify, repeats, clear_cache)})
+        expr = sp.sympify(key)
+        results.append({"stage": "lambdify", "case": case, "size": 0,
+                        **measure(lambda _: sp.lambdify(x, expr, modules=["numpy"]), repeats)})
+        f = sp.lambdify(x, expr, modules=["numpy"])
+        for n in sizes:
+            x_vals = np.linspace(-10, 10, n)
+            with np.errstate(all='ignore'):
+                raw = f(x_vals)
+                results.append({"stage": "evaluate", "case": case, "size": n,
+                                **measure(lambda _: f(x_vals), repeats)})
+                out = np.empty(n)
+                results.append({"stage": "mask", "case": case, "size": n,
+                                **measure(lambda _: store_real(raw, out), repeats)})
+            if n > skip_draw_above:
+                continue
+            def setup():
+                fig = Figure(figsize=(7, 5))
+                FigureCanvasAgg(fig)
+                ax = fig.add_subplot()
+                style_axes(fig, ax)
+                return fig, ax
+            def draw(state):
+                fig, ax = state
+                ax.plot(x_vals, out, color="#6a11cb", linewidth=2.2, label=equation)
+                ax.legend(loc="upper left", facecolor="#ffffff", framealpha=0.85, edgecolor="#6a11cb", fontsize=10)
+                label_axes(ax)
+                fig.canvas.draw()
+            results.append({"stage": "plot+draw", "case": case, "size": n, **measure(draw, repeats, setup)})
+
+def bench_history(results, sizes, repeats, skip_excel_above):
+    workdir = tempfile.mkdtemp(prefix="grapher-bench-")
+    try:
+        for n in sizes:
+            db_path = os.path.join(workdir, f"h{n}.db")
+            csv_path = os.path.join(workdir, f"h{n}.csv")
+            store = HistoryStore(db_path, legacy_csv_path=None)
+            with store.conn:
+                store.conn.executemany(
+                    "INSERT INTO history (equation, min_x, max_x, color, colorname, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                    ((list(CORPUS.values())[i % len(CORPUS)], -10.0, 10.0, "#6a11cb", "custom",
+                      "2025-01-01 00:00:00") for i in range(n)))
+            item = {"equation": "x^2", "min_x": -10.0, "max_x": 10.0, "color": "#6a11cb",
+                    "colorname": "custom", "timestamp": "2025-01-01 00:00:00"}
+            results.append({"stage": "history append", "case": "sqlite", "size": n,
+                             **measure(lambda _: store.append(dict(item)), repeats)})
+            results.append({"stage": "history load", "case": "sqlite", "size": n,
+                            **measure(lambda _: store.load_all(), repeats)})
+            # CSV round trip; import_csv backs the history Import… button
+            results.append({"stage": "history save csv", "case": "csv", "size": n,
+                            **measure(lambda _: store.export_csv(csv_path), repeats)})
+            def fresh_store():
+                path = os.path.join(workdir, "import.db")
+                if os.path.exists(path):
+                    os.remove(path)
+                return HistoryStore(path, legacy_csv_path=None)
+            def import_csv(target):
+                target.import_csv(csv_path)
+                target.close()
+            results.append({"stage": "history load csv", "case": "csv", "size": n,
+                            **measure(import_csv, repeats, fresh_store)})
+            if n <= skip_excel_above:
+                if importlib.util.find_spec("openpyxl") is None:
+                    results.append({"stage": "excel export", "case": "xlsx", "size": n,
+                                    "skipped": "openpyxl is not installed"})
+                else:
+                    xlsx_path = os.path.join(workdir, f"h{n}.xlsx")
+                    results.append({"stage": "excel export", "case": "xlsx", "size": n,
+                                    **measure(lambda _: export_store(store, xlsx_path), repeats)})
+            store.conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def metadata():
+    import sympy
+    import matplotlib
+    return {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "numpy": np.__version__, "sympy": sympy.__version__,
+            "matplotlib": matplotlib.__version__}
+
+def compare(current, baseline, threshold, noise_floor=1e-4):
+    # A regression is a median that grew by more than threshold and by more than the noise floor
+    base = {(r["stage"], r["case"], r["size"]): r for r in baseline["results"]}
+    report = []
+    for r in current["results"]:
+        old = base.get((r["stage"], r["case"], r["size"]))
+        if old is None or "skipped" in r or "skipped" in old:
+            continue
+        ratio = r["median_s"] / old["median_s"] if old["median_s"] > 0 else float("inf")
+        regressed = ratio > 1 + threshold and r["median_s"] - old["median_s"] > noise_floor
+        report.append({"stage": r["stage"], "case": r["case"], "size": r["size"], "baseline_s": old["median_s"],
+                       "current_s": r["median_s"], "ratio": ratio, "regression": regressed})
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the grapher's plot pipeline and history I/O.")
+    parser.add_argument("--out", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging (0.10 = 10%%)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="small sizes only, for a fast sanity run")
+    parser.add_argument("--skip-history", action="store_true")
+    parser.add_argument("--skip-pipeline", action="store_true")
+    args = parser.parse_args(argv)
+
+    sample_sizes = QUICK_SAMPLE_SIZES if args.quick else SAMPLE_SIZES
+    history_sizes = QUICK_HISTORY_SIZES if args.quick else HISTORY_SIZES
+    results = []
+    data = {"meta": metadata(), "results": results}
+    try:
+        if not args.skip_pipeline:
+            bench_pipeline(results, sample_sizes, args.repeats, skip_draw_above=10**6)
+        if not args.skip_history:
+            bench_history(results, history_sizes, args.repeats, skip_excel_above=10**4)
+    finally:
+        # Whatever was measured before a failure is still worth keeping
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+    for r in results:
+        size = f"n={r['size']}" if r["size"] else ""
+        timing = f"skipped ({r['skipped']})" if "skipped" in r else f"{r['median_s'] * 1000:10.3f} ms"
+        print(f"{r['stage']:<18}{r['case']:<18}{size:<12}{timing}")
+    print(f"Wrote {len(results)} results to {args.out}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report = compare(data, baseline, args.threshold)
+        regressions = [r for r in report if r["regression"]]
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} {r['case']} n={r['size']}: "
+                  f"{r['baseline_s'] * 1000:.3f} ms -> {r['current_s'] * 1000:.3f} ms ({r['ratio']:.2f}x)")
+        print(f"{len(report)} results compared, {len(regressions)} regressions over {args.threshold:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# Runs parse/compile/evaluate for the GUI in a separate, killable process so a pathological
+# expression (deep nesting, factorial(10**6), giant powers) can't freeze the Tk main loop.
+# One worker is kept warm; it is killed and immediately replaced on timeout or cancellation.
+import os
+import time
+import multiprocessing as mp
+import numpy as np
+from grapher_core import ExpressionCache, adaptive_sample, free_parameters, store_real
+
+def _limit_memory(memory_mb):
+    # Cap the address space at what the warm worker already uses plus the budget. Linux only:
+    # the baseline comes from /proc, macOS doesn't enforce RLIMIT_AS and Windows has no
+    # resource module, so elsewhere this does nothing and only the timeout applies
+    try:
+        import resource
+        with open('/proc/self/statm') as f:
+            baseline = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (ImportError, OSError, ValueError):
+        return
+    limit = baseline + memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+def _worker_main(conn, memory_mb):
+    cache = ExpressionCache()
+    cache.get("x")  # pulls in sympy's parser and lambdify printer before the first real job
+    _limit_memory(memory_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        job_id, equation, min_x, max_x, tol, max_points, want_entry, profile, params, field, seed = job
+        if seed is not None and not cache.has_entry(equation, field=field):
+            # The GUI already compiled this equation; rebuilding from its source skips sympy
+            cache.import_entry(*seed)
+        cache.last_timings = None
+        try:
+            expr, f = cache.get_field(equation) if field else cache.get(equation)
+        except MemoryError:
+            conn.send((job_id, "memory", None))
+            continue
+        except Exception as e:
+            conn.send((job_id, "parse", str(e)))
+            continue
+        if field:
+            _check_field(conn, cache, job_id, equation, f, min_x, max_x, want_entry)
+            continue
+        # Free parameters are sampled at the values given (1.0 when not given)
+        names = [s.name for s in free_parameters(expr, cache.x)]
+        values = {name: params.get(name, 1.0) for name in names}
+        if names:
+            func = f
+            f = lambda x_vals: func(x_vals, *values.values())
+        stats = {} if profile else None
+        sample_start = time.perf_counter()
+        try:
+            x, y = adaptive_sample(f, min_x, max_x, tol=tol, max_points=max_points, stats=stats)
+        except MemoryError:
+            conn.send((job_id, "memory", None))
+            continue
+        except Exception as e:
+            conn.send((job_id, "eval", str(e)))
+            continue
+        payload = {"x": x, "y": y, "params": values, "entry": cache.export_entry(equation) if want_entry else None}
+        if profile:
+            stats["sample_start"] = sample_start
+            stats["sample"] = time.perf_counter() - sample_start
+            stats["compile"] = cache.last_timings
+            stats["pid"] = os.getpid()
+            payload["stats"] = stats
+        try:
+            conn.send((job_id, "ok", payload))
+        except Exception as e:
+            conn.send((job_id, "eval", str(e)))
+
+def _check_field(conn, cache, job_id, equation, f, min_x, max_x, want_entry, samples=33):
+    # 2D equations are only compiled and tried on a coarse grid here, which catches evaluation
+    # errors and runaway expressions; the GUI evaluates the tiles itself
+    grid = np.linspace(min_x, max_x, samples)
+    values = np.empty((samples, samples))
+    try:
+        with np.errstate(all='ignore'):
+            store_real(f(grid[np.newaxis, :], grid[:, np.newaxis]), values)
+    except MemoryError:
+        conn.send((job_id, "memory", None))
+        return
+    except Exception as e:
+        conn.send((job_id, "eval", str(e)))
+        return
+    entry = cache.export_entry(equation, field=True) if want_entry else None
+    conn.send((job_id, "ok", {"x": grid, "y": values, "params": {}, "entry": entry}))
+
+class EvaluationSandbox:
+    # Non-blocking: submit() hands a job to the worker and poll() (called from the Tk loop)
+    # returns (job_id, status, payload) once it finishes. status is one of "ok", "parse",
+    # "eval", "memory", "timeout" or "crashed". Only one job runs at a time; submitting
+    # while busy cancels the running job.
+    def __init__(self, timeout=5.0, memory_mb=1024):
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self._ctx = mp.get_context("spawn")  # never fork a process that is running Tk and threads
+        self._process = None
+        self._conn = None
+        self._job = None
+        self._started = 0.0
+        self._spawn()
+
+    def _spawn(self):
+        parent, child = self._ctx.Pipe()
+        self._process = self._ctx.Process(target=_worker_main, args=(child, self.memory_mb), daemon=True)
+        self._process.start()
+        child.close()
+        self._conn = parent
+
+    def _restart(self):
+        self._conn.close()
+        self._process.terminate()
+        self._process.join(1.0)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._spawn()
+
+    @property
+    def busy(self):
+        return self._job is not None
+
+    def submit(self, job_id, equation, min_x, max_x, tol=1e-3, max_points=4000, want_entry=True, profile=False,
+               params=None, field=False, entry=None):
+        # profile=True adds a "stats" dict to the payload: parse/compile/evaluate/mask timings
+        # (perf_counter based) and the number of evaluated points. params maps free parameter
+        # names to values; the payload's "params" holds the values actually used, in argument order.
+        # field=True compiles an f(x, y) equation and checks it on a coarse grid over
+        # [min_x, max_x]^2 instead; "y" is then that grid of values. entry is an export_entry()
+        # tuple for the equation, which the worker uses instead of compiling it again
+        if self._job is not None:
+            self.cancel()
+        self._job = job_id
+        self._started = time.monotonic()
+        self._conn.send((job_id, equation, min_x, max_x, tol, max_points, want_entry, profile, params or {}, field, entry))
+
+    def cancel(self):
+        if self._job is not None:
+            self._job = None
+            self._restart()
+
+    def poll(self):
+        if self._job is None:
+            return None
+        job_id = self._job
+        try:
+            while self._conn.poll():
+                result = self._conn.recv()
+                if result[0] == job_id:
+                    self._job = None
+                    return result
+        except (EOFError, OSError):
+            self._job = None
+            self._restart()
+            return job_id, "crashed", None
+        if not self._process.is_alive():
+            self._job = None
+            self._spawn()
+            return job_id, "crashed", None
+        if time.monotonic() - self._started > self.timeout:
+            self._job = None
+            self._restart()
+            return job_id, "timeout", None
+        return None
+
+    def close(self):
+        try:
+            self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self._process.join(0.5)
+        if self._process.is_alive():
+            self._process.terminate()
@@ -0,0 +1,262 @@
+# Tiled evaluation of f(x, y) for implicit curves (f = 0) and heatmaps. The plane is cut into
+# square, world-aligned tiles whose size halves with each zoom level, so panning reuses tiles
+# and zooming by a factor of two lands on the next level. Tiles are evaluated on a thread pool
+# (numpy releases the GIL in its ufunc loops), cached by expression, zoom level, tile index and
+# resolution, and drawn coarse first and refined when the full-resolution pass finishes.
+import math
+from collections import OrderedDict
+import numpy as np
+from grapher_core import store_real
+
+TILE_PIXELS = 256  # target on-screen size of one tile
+FINE_SAMPLES = 128  # grid cells per tile side
+COARSE_SAMPLES = 16
+
+# Marching-squares segments per corner-sign case. Corners: 0 bottom-left, 1 bottom-right,
+# 2 top-right, 3 top-left (bit k set when corner k is positive). Edges: 0 bottom, 1 right,
+# 2 top, 3 left. -1 pads cases with a single segment.
+_SEGMENTS = np.array([
+    [[-1, -1], [-1, -1]], [[3, 0], [-1, -1]], [[0, 1], [-1, -1]], [[3, 1], [-1, -1]],
+    [[1, 2], [-1, -1]], [[0, 1], [3, 2]], [[0, 2], [-1, -1]], [[3, 2], [-1, -1]],
+    [[3, 2], [-1, -1]], [[0, 2], [-1, -1]], [[3, 0], [1, 2]], [[1, 2], [-1, -1]],
+    [[3, 1], [-1, -1]], [[0, 1], [-1, -1]], [[3, 0], [-1, -1]], [[-1, -1], [-1, -1]],
+])
+# Both saddle entries above assume a positive cell centre (the positive corners join up); they
+# flip to these pairings when the centre is not positive
+_SADDLE_FLIP = {5: [[3, 0], [1, 2]], 10: [[0, 1], [3, 2]]}
+
+def marching_squares(xs, ys, values, level=0.0):
+    # Contour segments of values (rows follow ys, columns xs) at level, as an (n, 2, 2) array of
+    # ((x0, y0), (x1, y1)). Every cell is classified and interpolated at once; cells touching a
+    # NaN are skipped so domain edges and poles don't produce spurious lines.
+    v = values - level
+    c0, c1, c2, c3 = v[:-1, :-1], v[:-1, 1:], v[1:, 1:], v[1:, :-1]
+    case = (c0 > 0) * 1 + (c1 > 0) * 2 + (c2 > 0) * 4 + (c3 > 0) * 8
+    valid = np.isfinite(c0) & np.isfinite(c1) & np.isfinite(c2) & np.isfinite(c3) & (case != 0) & (case != 15)
+    rows, cols = np.nonzero(valid)
+    if not len(rows):
+        return np.zeros((0, 2, 2))
+    case = case[rows, cols]
+    f0, f1, f2, f3 = c0[rows, cols], c1[rows, cols], c2[rows, cols], c3[rows, cols]
+    x0, x1 = xs[cols], xs[cols + 1]
+    y0, y1 = ys[rows], ys[rows + 1]
+    with np.errstate(all='ignore'):
+        t = np.stack([f0 / (f0 - f1), f1 / (f1 - f2), f3 / (f3 - f2), f0 / (f0 - f3)])
+    t = np.nan_to_num(t, nan=0.5)  # only reached on edges without a crossing
+    edges = np.empty((4, len(rows), 2))
+    edges[0] = np.column_stack([x0 + t[0] * (x1 - x0), y0])
+    edges[1] = np.column_stack([x1, y0 + t[1] * (y1 - y0)])
+    edges[2] = np.column_stack([x0 + t[2] * (x1 - x0), y1])
+    edges[3] = np.column_stack([x0, y0 + t[3] * (y1 - y0)])
+    table = _SEGMENTS[case]
+    center = (f0 + f1 + f2 + f3) / 4
+    for saddle, pairs in _SADDLE_FLIP.items():
+        flip = (case == saddle) & (center <= 0)
+        table[flip] = pairs
+    cell = np.arange(len(rows))
+    segments = []
+    for slot in range(2):
+        a, b = table[:, slot, 0], table[:, slot, 1]
+        used = a >= 0
+        segments.append(np.stack([edges[a[used], cell[used]], edges[b[used], cell[used]]], axis=1))
+    return np.concatenate(segments)
+
+def zoom_level(width, pixels):
+    # Level z has tiles 2**-z world units wide; pick the one closest to TILE_PIXELS on screen
+    return int(round(-math.log2(width * TILE_PIXELS / max(pixels, 1))))
+
+def tile_bounds(z, i, j):
+    size = 2.0 ** -z
+    return i * size, (i + 1) * size, j * size, (j + 1) * size
+
+def visible_tiles(xlim, ylim, z):
+    size = 2.0 ** -z
+    i0, i1 = math.floor(min(xlim) / size), math.floor(max(xlim) / size)
+    j0, j1 = math.floor(min(ylim) / size), math.floor(max(ylim) / size)
+    return [(i, j) for j in range(j0, j1 + 1) for i in range(i0, i1 + 1)]
+
+class Tile:
+    __slots__ = ("xs", "ys", "values", "segments", "nbytes")
+
+    def __init__(self, xs, ys, values, segments):
+        self.xs = xs
+        self.ys = ys
+        self.values = values
+        self.segments = segments
+        self.nbytes = values.nbytes + (segments.nbytes if segments is not None else 0)
+
+def evaluate_tile(f, z, i, j, samples, implicit):
+    # Nodes sit on the tile edges, so neighbouring tiles share their boundary samples and
+    # contours join up across tiles
+    x0, x1, y0, y1 = tile_bounds(z, i, j)
+    xs = np.linspace(x0, x1, samples + 1)
+    ys = np.linspace(y0, y1, samples + 1)
+    values = np.empty((samples + 1, samples + 1))
+    with np.errstate(all='ignore'):
+        store_real(f(xs[np.newaxis, :], ys[:, np.newaxis]), values)
+    return Tile(xs, ys, values, marching_squares(xs, ys, values) if implicit else None)
+
+class TileCache:
+    # LRU of evaluated tiles bounded by total bytes; shared by every field in the window
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._tiles = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def __contains__(self, key):
+        return key in self._tiles
+
+    def get(self, key):
+        tile = self._tiles.get(key)
+        if tile is None:
+            self.misses += 1
+            return None
+        self._tiles.move_to_end(key)
+        self.hits += 1
+        return tile
+
+    def put(self, key, tile):
+        if tile.nbytes > self.max_bytes:
+            return
+        old = self._tiles.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._tiles[key] = tile
+        self._bytes += tile.nbytes
+        while self._bytes > self.max_bytes:
+            _, old = self._tiles.popitem(last=False)
+            self._bytes -= old.nbytes
+            self.evictions += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "tiles": len(self._tiles), "bytes": self._bytes}
+
+    def clear(self):
+        self._tiles.clear()
+        self._bytes = 0
+
+class TiledField:
+    # One implicit curve or heatmap on the axes. update_view() draws whatever tiles are cached for
+    # the current view and queues the rest on the executor (all coarse passes before any fine
+    # one); collect(), polled from the GUI thread, stores finished tiles and redraws.
+    def __init__(self, ax, equation, key, func, mode, color, cache, executor, profiler=None):
+        self.ax = ax
+        self.equation = equation
+        self.key = key
+        self.func = func
+        self.mode = mode  # "implicit" or "heatmap"
+        self.color = color
+        self.cache = cache
+        self.executor = executor
+        self.profiler = profiler
+        self._pending = {}  # cache key -> Future
+        self._needed = []
+        self._images = {}  # (z, i, j) -> AxesImage showing that tile
+        self._lines = None
+        self._norm = None
+        if mode == "implicit":
+            from matplotlib.collections import LineCollection
+            self._lines = LineCollection([], colors=color, linewidths=2.2, label=equation)
+            ax.add_collection(self._lines, autolim=False)
+        else:
+            from matplotlib.colors import Normalize
+            self._norm = Normalize()
+
+    @property
+    def busy(self):
+        return bool(self._pending)
+
+    def _evaluate(self, z, i, j, samples):
+        if self.profiler is None:
+            return evaluate_tile(self.func, z, i, j, samples, self.mode == "implicit")
+        with self.profiler.span("tile", z=z, samples=samples):
+            return evaluate_tile(self.func, z, i, j, samples, self.mode == "implicit")
+
+    def update_view(self, xlim, ylim, pixels):
+        z = zoom_level(xlim[1] - xlim[0], pixels)
+        self._needed = [(z, i, j) for i, j in visible_tiles(xlim, ylim, z)]
+        wanted = set()
+        for samples in (COARSE_SAMPLES, FINE_SAMPLES):
+            for z, i, j in self._needed:
+                key = (self.key, z, i, j, samples)
+                if key in self.cache or (self.key, z, i, j, FINE_SAMPLES) in self.cache:
+                    continue
+                wanted.add(key)
+                if key not in self._pending:
+                    self._pending[key] = self.executor.submit(self._evaluate, z, i, j, samples)
+        # Tiles that scrolled out of view before starting are dropped
+        for key, future in list(self._pending.items()):
+            if key not in wanted and future.cancel():
+                del self._pending[key]
+        self.redraw()
+
+    def collect(self):
+        changed = False
+        for key, future in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[key]
+            if future.cancelled():
+                continue
+            try:
+                self.cache.put(key, future.result())
+            except Exception:
+                continue
+            changed = True
+        if changed:
+            self.redraw()
+        return changed
+
+    def _best(self, z, i, j):
+        # Full resolution when it has arrived, otherwise the coarse pass
+        for samples in (FINE_SAMPLES, COARSE_SAMPLES):
+            key = (self.key, z, i, j, samples)
+            if key in self.cache:
+                return self.cache.get(key)
+        return None
+
+    def redraw(self):
+        tiles = {tile_id: self._best(*tile_id) for tile_id in self._needed}
+        if self.mode == "implicit":
+            segments = [t.segments for t in tiles.values() if t is not None and len(t.segments)]
+            self._lines.set_segments(np.concatenate(segments) if segments else [])
+            return
+        finite = [t.values[np.isfinite(t.values)] for t in tiles.values() if t is not None]
+        finite = np.concatenate(finite) if finite else np.zeros(0)
+        if len(finite):
+            lo, hi = np.percentile(finite, [2, 98])
+            self._norm.vmin, self._norm.vmax = lo, hi if hi > lo else lo + 1.0
+        for tile_id in list(self._images):
+            if tile_id not in tiles or tiles[tile_id] is None:
+                self._images.pop(tile_id).remove()
+        for tile_id, tile in tiles.items():
+            if tile is None:
+                continue
+            # Samples are on cell corners, so pixels are centred on them: pad by half a cell
+            dx, dy = (tile.xs[1] - tile.xs[0]) / 2, (tile.ys[1] - tile.ys[0]) / 2
+            extent = (tile.xs[0] - dx, tile.xs[-1] + dx, tile.ys[0] - dy, tile.ys[-1] + dy)
+            image = self._images.get(tile_id)
+            if image is None:
+                self._images[tile_id] = self.ax.imshow(tile.values, origin="lower", extent=extent, cmap="viridis",
+                                                       norm=self._norm, interpolation="nearest", aspect="auto",
+                                                       zorder=0)
+            elif image.get_array().shape != tile.values.shape:
+                image.set_data(tile.values)
+                image.set_extent(extent)
+
+    def remove(self):
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        for image in self._images.values():
+            image.remove()
+        self._images.clear()
+        if self._lines is not None:
+            self._lines.remove()
@@ -0,0 +1,490 @@
+# Tk-free core of the grapher: parse/compile, evaluate, sample and render.
+# Used by the GUI and by headless tools such as batch_render.py.
+# sympy and matplotlib are imported on first use so the GUI can paint its window without them.
+import os
+import sys
+import time
+import json
+import inspect
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Helper for color name conversion (uses basic mapping; you can extend as needed)
+def hex_to_name(hex_color):
+    web_colors = {
+        '#000000': 'black', '#ffffff': 'white', '#ff0000': 'red', '#008000': 'green', 
+        '#0000ff': 'blue', '#ffff00': 'yellow', '#00ffff': 'cyan', '#ff00ff': 'magenta',
+        '#800000': 'maroon', '#808000': 'olive', '#800080': 'purple', '#008080': 'teal',
+        '#c0c0c0': 'silver', '#808080': 'gray', '#f0e68c': 'khaki', '#6a11cb': 'custom' # Example fallback
+    }
+    hex_color = hex_color.lower()
+    if hex_color in web_colors:
+        return web_colors[hex_color]
+    # Fallback: show 'custom' or the hex code itself
+    return 'custom' if not hex_color in web_colors else web_colors[hex_color]
+
+def normalize_equation(equation):
+    # Same rewrite plot_equation has always done, minus whitespace so "x ^ 2" and "x^2" share a key
+    return "".join(equation.replace('^', '**').split())
+
+FIELD_PREFIX = "field:"  # cache-key prefix for f(x, y) expressions compiled by get_field
+
+def free_parameters(expr, x):
+    # Symbols other than x, in name order; compiled callables take them after x: f(x, a, b, ...)
+    return sorted((s for s in expr.free_symbols if s != x), key=lambda s: s.name)
+
+class ExpressionCache:
+    # LRU cache of sympified expressions and their lambdified numpy callables.
+    # Bounded by entry count and by an approximate byte budget; can persist to disk.
+    def __init__(self, max_entries=256, max_bytes=8 * 1024 * 1024, persist_path=None, load=True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.persist_path = persist_path
+        self._x = None
+        self._y = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._namespace = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.time_saved = 0.0
+        self.last_timings = None  # (start, parse_s, compile_s) of the most recent miss
+        self._last_miss = None  # (key, entry) of the most recent compile, kept or not
+        if persist_path and load:
+            self.load()
+
+    @property
+    def x(self):
+        if self._x is None:
+            import sympy as sp
+            self._x = sp.symbols('x')
+        return self._x
+
+    @property
+    def y(self):
+        if self._y is None:
+            import sympy as sp
+            self._y = sp.symbols('y')
+        return self._y
+
+    def get(self, equation):
+        return self._lookup(normalize_equation(equation))
+
+    def get_field(self, equation):
+        # f(x, y) for the 2D modes; "lhs = rhs" compiles to lhs - rhs so the curve is f = 0
+        return self._lookup(FIELD_PREFIX + normalize_equation(equation))
+
+    def _parse(self, key):
+        import sympy as sp
+        if not key.startswith(FIELD_PREFIX):
+            return sp.sympify(key)
+        lhs, eq, rhs = key[len(FIELD_PREFIX):].partition("=")
+        expr = sp.sympify(lhs) - sp.sympify(rhs) if eq else sp.sympify(lhs)
+        extra = expr.free_symbols - {self.x, self.y}
+        if extra:
+            raise ValueError("Only x and y may appear in a 2D equation, found " +
+                             ", ".join(sorted(s.name for s in extra)))
+        return expr
+
+    def _arguments(self, key, expr):
+        if key.startswith(FIELD_PREFIX):
+            return [self.x, self.y]
+        return [self.x, *free_parameters(expr, self.x)]
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if entry["func"] is None:
+                entry["func"] = self._rebuild(key, entry)
+            self.hits += 1
+            self.time_saved += entry["cost"]
+            return entry["expr"], entry["func"]
+        self.misses += 1
+        entry = self._compile(key)
+        self.last_timings = entry.pop("timings")
+        self._last_miss = key, entry
+        self._insert(key, entry)
+        return entry["expr"], entry["func"]
+
+    def _compile(self, key):
+        import sympy as sp
+        start = time.perf_counter()
+        expr = self._parse(key)
+        parsed = time.perf_counter()
+        func = sp.lambdify(self._arguments(key, expr), expr, modules=["numpy"])
+        cost = time.perf_counter() - start
+        try:
+            source = inspect.getsource(func)
+        except (OSError, TypeError):
+            source = None
+        return {"expr": expr, "func": func, "source": source, "cost": cost,
+                "timings": (start, parsed - start, cost - (parsed - start))}
+
+    def _insert(self, key, entry):
+        # Replacing a key (e.g. importing an entry that is already cached) drops the old copy
+        # first, so its size isn't counted twice and the new one becomes most recently used
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old["size"]
+        entry["size"] = self._estimate_size(key, entry)
+        if entry["size"] > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry["size"]
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old["size"]
+            self.evictions += 1
+
+    def _estimate_size(self, key, entry):
+        # Rough footprint: key, source text and the expression tree (~200 bytes per node)
+        import sympy as sp
+        nodes = sum(1 for _ in sp.preorder_traversal(entry["expr"]))
+        return sys.getsizeof(key) + sys.getsizeof(entry["source"] or "") + 200 * nodes
+
+    def _rebuild(self, key, entry):
+        # Re-exec the generated source in lambdify's numpy namespace; far cheaper than lambdify itself
+        import sympy as sp
+        if entry["source"]:
+            if self._namespace is None:
+                self._namespace = sp.lambdify(self.x, self.x, modules=["numpy"]).__globals__
+            namespace = dict(self._namespace)
+            try:
+                exec(entry["source"], namespace)
+                return namespace["_lambdifygenerated"]
+            except Exception:
+                pass
+        return sp.lambdify(self._arguments(key, entry["expr"]), entry["expr"], modules=["numpy"])
+
+    def __contains__(self, equation):
+        return self.has_entry(equation)
+
+    def has_entry(self, equation, field=False):
+        return (FIELD_PREFIX if field else "") + normalize_equation(equation) in self._entries
+
+    def export_entry(self, equation, field=False):
+        # Picklable (key, expr, source, cost) tuple, e.g. to hand a compiled entry to another process.
+        # The most recent compile is exportable even if it was too large to keep.
+        key = (FIELD_PREFIX if field else "") + normalize_equation(equation)
+        e = self._entries.get(key)
+        if e is None and self._last_miss is not None and self._last_miss[0] == key:
+            e = self._last_miss[1]
+        if e is None:
+            raise KeyError(key)
+        return key, e["expr"], e["source"], e["cost"]
+
+    def import_entry(self, key, expr, source, cost):
+        # Counts as a miss: the compile happened, just somewhere else
+        self.misses += 1
+        entry = {"expr": expr, "func": None, "source": source, "cost": cost}
+        entry["func"] = self._rebuild(key, entry)
+        self._insert(key, entry)
+        return expr, entry["func"]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "bytes": self._bytes, "time_saved": self.time_saved}
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._last_miss = None
+
+    def save(self):
+        # Only the normalized equations are written; they are re-parsed and compiled on load,
+        # so the file never carries anything that gets executed as-is
+        if not self.persist_path:
+            return
+        tmp_path = self.persist_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": 3, "equations": list(self._entries)}, f)
+        os.replace(tmp_path, self.persist_path)
+
+    def read_persisted(self):
+        # Reads and compiles the saved equations without touching the cache, so it can run off
+        # the Tk thread; pass the result to add_persisted on the thread that owns the cache.
+        # Always compiles a trivial expression first, so sympy's parser and lambdify printer are
+        # loaded even on a fresh install with nothing saved.
+        self._compile("x")
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return []
+        try:
+            with open(self.persist_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if not isinstance(data, dict) or data.get("version") != 3:
+            return []
+        entries = []
+        for key in data.get("equations", [])[-self.max_entries:]:
+            if not isinstance(key, str):
+                continue
+            try:
+                entry = self._compile(key)
+            except Exception:
+                continue
+            entries.append((key, entry["expr"], entry["source"], entry["cost"], entry["func"]))
+        return entries
+
+    def add_persisted(self, entries):
+        for key, expr, source, cost, func in entries:
+            if key not in self._entries:
+                self._insert(key, {"expr": expr, "func": func, "source": source, "cost": cost})
+
+    def load(self):
+        self.add_persisted(self.read_persisted())
+
+EVAL_CHUNK = 1 << 16  # samples per f() call; bounds the size of numpy temporaries
+_scratch = threading.local()
+
+def scratch_buffer(n):
+    # Per-thread float64 buffer reused across evaluations (and replots); grows geometrically
+    buf = getattr(_scratch, "buf", None)
+    if buf is None or len(buf) < n:
+        buf = np.empty(max(n, 2 * len(buf) if buf is not None else 1024))
+        _scratch.buf = buf
+    return buf[:n]
+
+def evaluate_real(f, x_vals, out=None, chunk_size=EVAL_CHUNK, stats=None):
+    # Evaluate a lambdified callable into a float64 array. Real results (the common case) are copied
+    # straight in; only complex results pay for the imaginary-part check. Scalars such as "5" are
+    # broadcast. Complex and non-finite samples become NaN so lines break there.
+    # stats, if given, accumulates "evaluate"/"mask" seconds and evaluated "points"
+    if out is None:
+        out = np.empty(len(x_vals))
+    for start in range(0, len(x_vals), chunk_size):
+        if stats is None:
+            store_real(f(x_vals[start:start + chunk_size]), out[start:start + chunk_size])
+            continue
+        t0 = time.perf_counter()
+        result = f(x_vals[start:start + chunk_size])
+        t1 = time.perf_counter()
+        store_real(result, out[start:start + chunk_size])
+        stats["evaluate"] = stats.get("evaluate", 0.0) + (t1 - t0)
+        stats["mask"] = stats.get("mask", 0.0) + (time.perf_counter() - t1)
+    if stats is not None:
+        stats["points"] = stats.get("points", 0) + len(x_vals)
+    return out
+
+def store_real(result, dest):
+    # Copy a raw f() result into the float64 slice dest, with NaN for complex/non-finite samples
+    if np.iscomplexobj(result):
+        result = np.asarray(result)
+        dest[...] = result.real
+        dest[np.broadcast_to(result.imag != 0, dest.shape)] = np.nan
+    else:
+        dest[...] = result
+    dest[np.isinf(dest)] = np.nan
+
+def _y_scale(y):
+    finite = y[np.isfinite(y)]
+    if not len(finite):
+        return 1.0
+    lo, hi = np.percentile(finite, [5, 95])
+    return (hi - lo) or max(abs(lo), abs(hi), 1.0)
+
+def adaptive_sample(f, min_x, max_x, tol=1e-3, max_points=4000, initial_points=129, min_width_frac=1e-9, stats=None):
+    # Start from a coarse uniform grid and bisect, a whole batch of intervals per pass, wherever the
+    # midpoint deviates from the chord by more than tol (relative to the y-range) or a domain edge lies.
+    # Intervals still unresolved at the minimum width, and sign-flipping poles, get a NaN break.
+    x = np.linspace(min_x, max_x, initial_points)
+    with np.errstate(all='ignore'):
+        y = evaluate_real(f, x, stats=stats)
+    yscale = _y_scale(y)
+    min_width = (max_x - min_x) * min_width_frac
+    candidates = np.arange(len(x) - 1)
+    unresolved = []
+    while len(candidates) and len(x) < max_points:
+        xl, xr = x[candidates], x[candidates + 1]
+        xm = (xl + xr) / 2
+        with np.errstate(all='ignore'):
+            ym = evaluate_real(f, xm, out=scratch_buffer(len(xm)), stats=stats)
+        yl, yr = y[candidates], y[candidates + 1]
+        nan_l, nan_r, nan_m = np.isnan(yl), np.isnan(yr), np.isnan(ym)
+        err = np.abs(ym - (yl + yr) / 2) / yscale
+        edge = (nan_l | nan_r | nan_m) & ~(nan_l & nan_r & nan_m)
+        err = np.where(edge, np.inf, np.nan_to_num(err, nan=0.0))
+        wide = (xr - xl) > min_width
+        stuck = (err > tol) & ~wide & ~edge
+        if stuck.any():
+            unresolved.append(xl[stuck])
+        split = (err > tol) & wide
+        budget = max_points - len(x)
+        if split.sum() > budget:
+            keep = np.argsort(np.where(split, err, -1.0))[::-1][:budget]
+            split = np.zeros_like(split)
+            split[keep] = True
+        idx = candidates[split]
+        if not len(idx):
+            break
+        x = np.insert(x, idx + 1, xm[split])
+        y = np.insert(y, idx + 1, ym[split])
+        pos = idx + np.arange(len(idx))
+        candidates = np.sort(np.concatenate([pos, pos + 1]))
+    yl, yr = y[:-1], y[1:]
+    breaks = (np.sign(yl) != np.sign(yr)) & (np.minimum(np.abs(yl), np.abs(yr)) > yscale)
+    if unresolved:
+        breaks[np.searchsorted(x, np.concatenate(unresolved))] = True
+    idx = np.nonzero(breaks)[0]
+    if len(idx):
+        x = np.insert(x, idx + 1, (x[idx] + x[idx + 1]) / 2)
+        y = np.insert(y, idx + 1, np.nan)
+    return x, y
+
+class DecimationPyramid:
+    # Level-of-detail view of one sampled curve. The full-resolution x/y arrays are kept; each
+    # pyramid level stores, per block of samples, the indices of the first, last, min and max
+    # sample (M4 decimation) plus the first and last NaN so discontinuities survive. Blocks
+    # start at BASE samples and double per level, each level built from the one below.
+    # view() picks the level whose blocks hold about one pixel column's worth of samples and
+    # returns only the visible blocks, so its cost follows the screen width rather than the
+    # sample count. Adaptive sampling leaves x non-uniform, so a block whose x-span is wider
+    # than a column is split into its children, down to raw samples, instead of becoming a chord.
+    BASE = 16
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.levels = []
+        n = len(self.x)
+        if n < 4 * self.BASE:
+            return
+        self._itype = np.int32 if n < 2**31 else np.int64
+        level = self._base_level()
+        self.levels.append(level)
+        while len(level["first"]) > 1:
+            level = self._merge(level)
+            self.levels.append(level)
+
+    def _base_level(self):
+        b, n = self.BASE, len(self.y)
+        nb = -(-n // b)
+        pad = nb * b - n
+        y = np.concatenate([self.y, np.full(pad, np.nan)]) if pad else self.y
+        y = y.reshape(nb, b)
+        nan = np.isnan(y)
+        if pad:
+            nan[-1, b - pad:] = False
+        lo = np.where(np.isnan(y), np.inf, y)
+        hi = np.where(np.isnan(y), -np.inf, y)
+        rows = np.arange(nb)
+        offs = rows * b
+        amin, amax = lo.argmin(axis=1), hi.argmax(axis=1)
+        has_nan = nan.any(axis=1)
+        it = self._itype
+        return {
+            "block": b,
+            "first": offs.astype(it),
+            "last": np.minimum(offs + b - 1, n - 1).astype(it),
+            "argmin": (offs + amin).astype(it),
+            "argmax": (offs + amax).astype(it),
+            "ymin": lo[rows, amin],
+            "ymax": hi[rows, amax],
+            "firstnan": np.where(has_nan, offs + nan.argmax(axis=1), -1).astype(it),
+            "lastnan": np.where(has_nan, offs + b - 1 - nan[:, ::-1].argmax(axis=1), -1).astype(it),
+        }
+
+    def _merge(self, level):
+        if len(level["first"]) % 2:
+            # Pair the odd block with itself; merging a block with itself changes nothing
+            level = {k: (np.append(v, v[-1]) if k != "block" else v) for k, v in level.items()}
+        a = {k: v[0::2] for k, v in level.items() if k != "block"}
+        b = {k: v[1::2] for k, v in level.items() if k != "block"}
+        take_a_min = a["ymin"] <= b["ymin"]
+        take_a_max = a["ymax"] >= b["ymax"]
+        return {
+            "block": level["block"] * 2,
+            "first": a["first"],
+            "last": b["last"],
+            "argmin": np.where(take_a_min, a["argmin"], b["argmin"]),
+            "argmax": np.where(take_a_max, a["argmax"], b["argmax"]),
+            "ymin": np.minimum(a["ymin"], b["ymin"]),
+            "ymax": np.maximum(a["ymax"], b["ymax"]),
+            "firstnan": np.where(a["firstnan"] >= 0, a["firstnan"], b["firstnan"]),
+            "lastnan": np.where(b["lastnan"] >= 0, b["lastnan"], a["lastnan"]),
+        }
+
+    def view(self, x0, x1, pixels):
+        n = len(self.x)
+        i0 = max(int(np.searchsorted(self.x, x0, side='right')) - 1, 0)
+        i1 = min(int(np.searchsorted(self.x, x1, side='left')) + 1, n)
+        per_pixel = (i1 - i0) / max(pixels, 1)
+        if not self.levels or per_pixel < 2 * self.BASE:
+            return self.x[i0:i1], self.y[i0:i1]
+        k = min(int(np.log2(per_pixel / self.BASE)), len(self.levels) - 1)
+        column = (x1 - x0) / max(pixels, 1)
+        b = self.levels[k]["block"]
+        blocks = np.arange(i0 // b, (i1 - 1) // b + 1)
+        parts = []
+        for level in self.levels[k::-1]:
+            blocks = blocks[blocks < len(level["first"])]
+            first, last = level["first"][blocks], level["last"][blocks]
+            fits = self.x[last] - self.x[first] <= column
+            parts.append(self._block_points(level, blocks[fits]))
+            wide = blocks[~fits]
+            blocks = np.concatenate([2 * wide, 2 * wide + 1])
+        # Base blocks still wider than a column are sparse enough to draw sample by sample
+        raw = self.levels[0]["first"][wide][:, None] + np.arange(self.BASE)
+        parts.append(np.minimum(raw.ravel(), n - 1))
+        idx = np.unique(np.concatenate(parts))
+        return self.x[idx], self.y[idx]
+
+    @staticmethod
+    def _block_points(level, blocks):
+        first = level["first"][blocks]
+        firstnan, lastnan = level["firstnan"][blocks], level["lastnan"][blocks]
+        return np.concatenate([first, level["argmin"][blocks], level["argmax"][blocks], level["last"][blocks],
+                               np.where(firstnan >= 0, firstnan, first), np.where(lastnan >= 0, lastnan, first)])
+
+def style_axes(fig, ax, dark=True):
+    if dark:
+        fig.patch.set_facecolor('#0f1724')
+        ax.set_facecolor('#071428')
+        tick_color = 'white'
+        spine_color = 'white'
+        title_color = 'white'
+        grid_col = '#1f2a44'
+    else:
+        fig.patch.set_facecolor('#ffffff')
+        ax.set_facecolor('#f7fbff')
+        tick_color = '#222222'
+        spine_color = '#222222'
+        title_color = '#14213d'
+        grid_col = '#e6e9ef'
+    ax.tick_params(colors=tick_color)
+    for side in ['bottom','top','left','right']:
+        ax.spines[side].set_color(spine_color)
+    ax.xaxis.label.set_color(tick_color)
+    ax.yaxis.label.set_color(tick_color)
+    ax.title.set_color(title_color)
+    ax.grid(True, color=grid_col)
+
+def label_axes(ax):
+    ax.set_title('Mathematical Function Graph', loc='center')
+    ax.set_xlabel('x')
+    ax.set_ylabel('f(x)')
+
+def render_equation(equation, min_x, max_x, color, path, cache=None, dark=True, figsize=(7, 5), dpi=100,
+                    tol=1e-3, max_points=4000):
+    # Render one equation to an image file with the Agg backend (format taken from the extension)
+    if min_x >= max_x:
+        raise ValueError("Min X must be less than Max X")
+    cache = cache or ExpressionCache()
+    expr, f = cache.get(equation)
+    x_plot, y_plot = adaptive_sample(f, min_x, max_x, tol=tol, max_points=max_points)
+    if not np.isfinite(y_plot).any():
+        raise ValueError("Function has no valid real outputs in this range")
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    style_axes(fig, ax, dark=dark)
+    ax.plot(x_plot, y_plot, color=color, linewidth=2.2, label=equation)
+    ax.legend(loc="upper left", facecolor="#ffffff", framealpha=0.85, edgecolor=color, fontsize=10)
+    label_axes(ax)
+    fig.savefig(path, facecolor=fig.get_facecolor())
+    return len(x_plot)
@@ -0,0 +1,113 @@
+# Streaming history export. Rows are read from the store in batches and handed to a
+# format writer one batch at a time, so memory stays flat regardless of history size.
+# xlsx needs openpyxl; Parquet and Feather need pyarrow. Both are optional.
+import os
+import csv
+import sqlite3
+import importlib.util
+from history_store import FIELDS
+
+class ExportCancelled(Exception):
+    pass
+
+class _CsvWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDS, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, batch):
+        self.writer.writerows(batch)
+
+    def close(self):
+        self.file.close()
+
+class _XlsxWriter:
+    def __init__(self, path):
+        from openpyxl import Workbook
+        self.path = path
+        # write_only workbooks stream rows to disk instead of building the sheet in memory
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet('history')
+        self.sheet.append(FIELDS)
+
+    def write(self, batch):
+        for item in batch:
+            self.sheet.append([item[f] for f in FIELDS])
+
+    def close(self):
+        self.workbook.save(self.path)
+
+class _ArrowWriter:
+    def __init__(self, path, feather=False):
+        import pyarrow as pa
+        self.pa = pa
+        self.schema = pa.schema([('equation', pa.string()), ('min_x', pa.float64()), ('max_x', pa.float64()),
+                                 ('color', pa.string()), ('colorname', pa.string()), ('timestamp', pa.string())])
+        if feather:
+            self.sink = pa.OSFile(path, 'wb')
+            self.writer = pa.ipc.new_file(self.sink, self.schema)
+        else:
+            import pyarrow.parquet as pq
+            self.sink = None
+            self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, batch):
+        columns = {f: [item[f] for item in batch] for f in FIELDS}
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+        if self.sink is not None:
+            self.sink.close()
+
+_WRITERS = {
+    '.csv': _CsvWriter,
+    '.xlsx': _XlsxWriter,
+    '.parquet': _ArrowWriter,
+    '.feather': lambda path: _ArrowWriter(path, feather=True),
+}
+
+def available_formats():
+    formats = [('CSV', '.csv')]
+    if importlib.util.find_spec('openpyxl') is not None:
+        formats.insert(0, ('Excel workbook', '.xlsx'))
+    if importlib.util.find_spec('pyarrow') is not None:
+        formats += [('Parquet', '.parquet'), ('Feather', '.feather')]
+    return formats
+
+def export_rows(batches, path, total=None, progress=None, cancel=None):
+    # batches: iterable of lists of history dicts. progress(done, total) is called after each
+    # batch; setting the cancel Event stops the export and removes the partial file.
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _WRITERS:
+        raise ValueError(f"Unsupported export format: {ext or path}")
+    writer = _WRITERS[ext](path)
+    done = 0
+    try:
+        for batch in batches:
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled()
+            writer.write(batch)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+        writer.close()
+    except BaseException:
+        try:
+            writer.close()
+        except Exception:
+            pass
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return done
+
+def export_store(store, path, progress=None, cancel=None, batch_size=5000):
+    # Safe to call from a worker thread: reads through its own sqlite connection
+    conn = sqlite3.connect(store.db_path)
+    try:
+        total = store.count(conn=conn)
+        return export_rows(store.iter_rows(batch_size, conn=conn), path, total, progress, cancel)
+    finally:
+        conn.close()
@@ -0,0 +1,220 @@
+# Equation history kept in SQLite (stdlib). Appends and deletes touch one row each;
+# deletes are tombstones that compact() removes in bulk. equation_history.csv files from
+# older versions are migrated on first run, and CSV import/export is kept for compatibility.
+import os
+import csv
+import bisect
+import sqlite3
+import numpy as np
+from grapher_core import hex_to_name
+
+FIELDS = ['equation', 'min_x', 'max_x', 'color', 'colorname', 'timestamp']
+
+class HistoryStore:
+    def __init__(self, db_path='equation_history.db', legacy_csv_path='equation_history.csv', compact_ratio=0.5):
+        self.db_path = db_path
+        self.compact_ratio = compact_ratio
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                equation TEXT NOT NULL, min_x REAL NOT NULL, max_x REAL NOT NULL,
+                color TEXT NOT NULL, colorname TEXT, timestamp TEXT NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0)""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS history_equation ON history(equation)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS history_timestamp ON history(timestamp)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        if legacy_csv_path and not self._meta('csv_migrated'):
+            if os.path.exists(legacy_csv_path):
+                self.import_csv(legacy_csv_path)
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('csv_migrated', ?)", (legacy_csv_path,))
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _row_to_item(self, row):
+        return {'id': row[0], 'equation': row[1], 'min_x': row[2], 'max_x': row[3],
+                'color': row[4], 'colorname': row[5], 'timestamp': row[6]}
+
+    def append(self, item):
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO history (equation, min_x, max_x, color, colorname, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                [item[f] for f in FIELDS])
+        item['id'] = cur.lastrowid
+        return item
+
+    def delete(self, item_id):
+        with self.conn:
+            self.conn.execute("UPDATE history SET deleted = 1 WHERE id = ?", (item_id,))
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM history")
+
+    def load_all(self, conn=None):
+        rows = (conn or self.conn).execute("SELECT id, " + ", ".join(FIELDS) + " FROM history WHERE deleted = 0 ORDER BY id")
+        return [self._row_to_item(row) for row in rows]
+
+    def iter_rows(self, batch_size=5000, conn=None):
+        # Pass a separate connection to read from another thread (WAL gives it a stable snapshot)
+        cur = (conn or self.conn).execute("SELECT id, " + ", ".join(FIELDS) + " FROM history WHERE deleted = 0 ORDER BY id")
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [self._row_to_item(row) for row in rows]
+
+    def count(self, conn=None):
+        return (conn or self.conn).execute("SELECT COUNT(*) FROM history WHERE deleted = 0").fetchone()[0]
+
+    def find(self, equation):
+        rows = self.conn.execute("SELECT id, " + ", ".join(FIELDS) +
+                                 " FROM history WHERE deleted = 0 AND equation = ? ORDER BY id", (equation,))
+        return [self._row_to_item(row) for row in rows]
+
+    def between(self, start, end):
+        # Timestamps are stored as "%Y-%m-%d %H:%M:%S", so string order is time order
+        rows = self.conn.execute("SELECT id, " + ", ".join(FIELDS) + " FROM history WHERE deleted = 0 "
+                                 "AND timestamp >= ? AND timestamp <= ? ORDER BY id", (start, end))
+        return [self._row_to_item(row) for row in rows]
+
+    def maybe_compact(self):
+        total, dead = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(deleted), 0) FROM history").fetchone()
+        if total and dead / total >= self.compact_ratio:
+            self.compact()
+
+    def compact(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM history WHERE deleted = 1")
+        self.conn.execute("VACUUM")
+
+    def import_csv(self, path):
+        # Rows whose (equation, timestamp) is already in the history are skipped, so loading
+        # the same CSV again doesn't duplicate it
+        with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+            reader = csv.DictReader(csvfile)
+            rows = ((row['equation'], float(row['min_x']), float(row['max_x']), row['color'],
+                     row.get('colorname') or hex_to_name(row['color']), row['timestamp'],
+                     row['equation'], row['timestamp']) for row in reader)
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO history (equation, min_x, max_x, color, colorname, timestamp) "
+                    "SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM history "
+                    "WHERE deleted = 0 AND equation = ? AND timestamp = ?)",
+                    rows)
+
+    def export_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for batch in self.iter_rows():
+                writer.writerows(batch)
+
+    def close(self):
+        # Compaction (and its VACUUM) happens here rather than on open to keep startup fast
+        self.maybe_compact()
+        self.conn.close()
+
+class HistoryIndex:
+    # In-memory search index over history items, kept in id order (ids only grow, so appends
+    # stay sorted and positions can be found by bisection). Substring search scans a list of
+    # lowercased equations; prefix search bisects a sorted copy. Range and date filters run
+    # vectorized over numpy columns that are rebuilt lazily after edits.
+    def __init__(self, items=()):
+        self.clear()
+        for item in items:
+            self._items[item['id']] = item
+            self._ids.append(item['id'])
+            self._eqs.append(item['equation'].lower())
+        self._sorted = sorted(zip(self._eqs, self._ids))
+
+    def clear(self):
+        self._items = {}
+        self._ids = []
+        self._eqs = []
+        self._sorted = []
+        self._columns = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def get(self, item_id):
+        return self._items[item_id]
+
+    def ids(self):
+        return list(self._ids)
+
+    def add(self, item):
+        key = item['equation'].lower()
+        self._items[item['id']] = item
+        self._ids.append(item['id'])
+        self._eqs.append(key)
+        bisect.insort(self._sorted, (key, item['id']))
+        self._columns = None
+
+    def remove(self, item_id):
+        item = self._items.pop(item_id)
+        pos = bisect.bisect_left(self._ids, item_id)
+        del self._ids[pos]
+        del self._eqs[pos]
+        del self._sorted[bisect.bisect_left(self._sorted, (item['equation'].lower(), item_id))]
+        self._columns = None
+
+    def _build_columns(self):
+        if self._columns is None:
+            items = [self._items[i] for i in self._ids]
+            self._columns = (np.array(self._ids, dtype=np.int64),
+                             np.array([it['min_x'] for it in items], dtype=float),
+                             np.array([it['max_x'] for it in items], dtype=float),
+                             np.array([it['timestamp'] for it in items], dtype=str))
+        return self._columns
+
+    def search(self, text='', prefix=False, x_from=None, x_to=None, date_from=None, date_to=None):
+        # Returns matching ids in history order. Dates compare as "%Y-%m-%d %H:%M:%S" strings,
+        # so a bare "2025-01-31" as date_to is widened to the end of that day.
+        text = text.strip().lower()
+        if text and prefix:
+            lo = bisect.bisect_left(self._sorted, (text,))
+            hi = bisect.bisect_left(self._sorted, (text + '￿',))
+            ids = sorted(item_id for _, item_id in self._sorted[lo:hi])
+        elif text:
+            ids = [self._ids[i] for i, eq in enumerate(self._eqs) if text in eq]
+        else:
+            ids = self._ids
+        if x_from is None and x_to is None and not date_from and not date_to:
+            return list(ids)
+        all_ids, min_x, max_x, stamps = self._build_columns()
+        if ids is self._ids:
+            mask = np.ones(len(all_ids), dtype=bool)
+        else:
+            mask = np.zeros(len(all_ids), dtype=bool)
+            mask[np.searchsorted(all_ids, ids)] = True
+        if x_from is not None:
+            mask &= min_x >= x_from
+        if x_to is not None:
+            mask &= max_x <= x_to
+        if date_from:
+            mask &= stamps >= date_from
+        if date_to:
+            mask &= stamps <= (date_to + ' 99' if len(date_to) <= 10 else date_to)
+        return all_ids[mask].tolist()
+
+    def matches(self, item, text='', prefix=False, x_from=None, x_to=None, date_from=None, date_to=None):
+        eq = item['equation'].lower()
+        text = text.strip().lower()
+        if text and not (eq.startswith(text) if prefix else text in eq):
+            return False
+        if x_from is not None and item['min_x'] < x_from:
+            return False
+        if x_to is not None and item['max_x'] > x_to:
+            return False
+        if date_from and item['timestamp'] < date_from:
+            return False
+        if date_to and item['timestamp'] > (date_to + ' 99' if len(date_to) <= 10 else date_to):
+            return False
+        return True
@@ -0,0 +1,95 @@
+# Lightweight stage timing for the plot pipeline. When the profiler is disabled, span()
+# hands back one shared no-op context manager, so instrumented code pays a method call and
+# an attribute check. Collected spans can be exported as Chrome trace-event JSON
+# (load the file in chrome://tracing or https://ui.perfetto.dev).
+import os
+import json
+import time
+import threading
+from collections import deque, defaultdict
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, self.start, time.perf_counter() - self.start, args=self.args)
+        return False
+
+class Profiler:
+    def __init__(self, history=20, max_events=100000):
+        self.enabled = False
+        self.history = history
+        self._recent = defaultdict(lambda: deque(maxlen=self.history))
+        self._events = deque(maxlen=max_events)
+        self._frames = deque(maxlen=120)
+        self.counters = defaultdict(int)
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def add(self, name, start, duration, pid=None, tid=None, args=None):
+        # start is a time.perf_counter() value; it is system-wide monotonic on the platforms we
+        # run on, so spans measured in the sandbox process line up with ours.
+        if not self.enabled:
+            return
+        self._recent[name].append(duration)
+        self._events.append((name, start, duration, pid or os.getpid(), tid or threading.get_ident(), args))
+
+    def count(self, name, n):
+        if not self.enabled:
+            return
+        self.counters[name] += n
+        self._events.append((name, time.perf_counter(), None, os.getpid(), 0, {name: self.counters[name]}))
+
+    def frame(self):
+        if self.enabled:
+            self._frames.append(time.perf_counter())
+
+    def fps(self, window=1.0):
+        now = time.perf_counter()
+        frames = [t for t in self._frames if now - t <= window]
+        if len(frames) < 2:
+            return 0.0
+        return (len(frames) - 1) / (frames[-1] - frames[0])
+
+    def recent(self):
+        # {stage: (last_s, mean_s)} over the last `history` samples of each stage
+        return {name: (values[-1], sum(values) / len(values)) for name, values in list(self._recent.items()) if values}
+
+    def clear(self):
+        self._recent.clear()
+        self._events.clear()
+        self._frames.clear()
+        self.counters.clear()
+
+    def export_chrome_trace(self, path):
+        events = []
+        for name, start, duration, pid, tid, args in list(self._events):
+            if duration is None:
+                events.append({"name": name, "ph": "C", "ts": start * 1e6, "pid": pid, "tid": tid, "args": args})
+            else:
+                events.append({"name": name, "cat": "grapher", "ph": "X", "ts": start * 1e6, "dur": duration * 1e6,
+                               "pid": pid, "tid": tid, "args": args or {}})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
@@ -1,41 +1,247 @@
+import time
+# Startup profile marks for --profile-startup. matplotlib's Tk backend is imported when the
+# graph panel is built (after the window is shown) and sympy is warmed on a background thread.
+STARTUP_MARKS = [("start", time.perf_counter())]
+def mark_startup(label):
+    STARTUP_MARKS.append((label, time.perf_counter()))
+
 import tkinter as tk
-from tkinter import ttk, messagebox, colorchooser
+from tkinter import ttk, messagebox, colorchooser, filedialog
+import tkinter.font as tkfont
+import bisect
+import sqlite3
+import sys
 from datetime import datetime
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import sympy as sp
 import os
-import csv
-import pandas as pd
-
-# Helper for color name conversion (uses basic mapping; you can extend as needed)
-def hex_to_name(hex_color):
-    web_colors = {
-        '#000000': 'black', '#ffffff': 'white', '#ff0000': 'red', '#008000': 'green', 
-        '#0000ff': 'blue', '#ffff00': 'yellow', '#00ffff': 'cyan', '#ff00ff': 'magenta',
-        '#800000': 'maroon', '#808000': 'olive', '#800080': 'purple', '#008080': 'teal',
-        '#c0c0c0': 'silver', '#808080': 'gray', '#f0e68c': 'khaki', '#6a11cb': 'custom' # Example fallback
-    }
-    hex_color = hex_color.lower()
-    if hex_color in web_colors:
-        return web_colors[hex_color]
-    # Fallback: show 'custom' or the hex code itself
-    return 'custom' if not hex_color in web_colors else web_colors[hex_color]
+import queue
+import threading
+mark_startup("import tkinter + stdlib")
+import numpy as np
+mark_startup("import numpy")
+from concurrent.futures import ThreadPoolExecutor
+from grapher_core import hex_to_name, ExpressionCache, adaptive_sample, normalize_equation, FIELD_PREFIX
+from plot_scene import PlotScene
+from param_frames import FrameCache, animation_formats, render_animation
+from field_tiles import TiledField, TileCache
+from history_store import HistoryStore, HistoryIndex
+from history_export import export_store, available_formats, ExportCancelled
+from eval_sandbox import EvaluationSandbox
+from instrumentation import Profiler
+mark_startup("import app modules")
+
+class ViewportResampler:
+    # Re-evaluates plotted curves for the visible x-range on a background thread.
+    # Requests are debounced on the Tk side and coalesced in the worker (only the newest
+    # pending job runs); results tagged with an older generation are dropped.
+    def __init__(self, root, on_result, delay_ms=60, poll_ms=25, profiler=None):
+        self.root = root
+        self.on_result = on_result
+        self.profiler = profiler or Profiler()
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self.generation = 0
+        self._after_id = None
+        self._pending = None
+        self._cond = threading.Condition()
+        self._results = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def request(self, curves, xlim, samples, tol=1e-3):
+        # curves: list of (key, callable); called from the Tk thread on every zoom/pan step.
+        # samples and tol are adaptive_sample's point budget and tolerance
+        self.generation += 1
+        job = (self.generation, list(curves), xlim, samples, tol)
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.delay_ms, lambda: self._submit(job))
+
+    def cancel(self):
+        self.generation += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _submit(self, job):
+        self._after_id = None
+        with self._cond:
+            self._pending = job
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                generation, curves, xlim, samples, tol = self._pending
+                self._pending = None
+            results = {}
+            for key, f in curves:
+                if generation != self.generation:
+                    break
+                stats = {} if self.profiler.enabled else None
+                try:
+                    with self.profiler.span("resample", budget=samples):
+                        results[key] = adaptive_sample(f, xlim[0], xlim[1], tol=tol, max_points=samples,
+                                                       stats=stats)
+                except Exception:
+                    continue
+                if stats:
+                    self.profiler.count("points", stats["points"])
+            self._results.put((generation, results))
+
+    def _poll(self):
+        try:
+            while True:
+                generation, results = self._results.get_nowait()
+                if generation == self.generation and results:
+                    self.on_result(results)
+        except queue.Empty:
+            pass
+        self.root.after(self.poll_ms, self._poll)
 
 class EquationGrapherApp:
     def __init__(self, root):
         self.root = root
         self.root.title("🎨📈 Fancy Equation Grapher")
         self.history = []
+        self.history_index = HistoryIndex()
+        self.history_view_ids = []  # ids matching the current search, in history order
+        self.history_offset = 0  # first view row shown in the listbox
+        self._history_rows = []
+        self._history_selected_id = None
+        self._history_filter_job = None
+        self._export_thread = None
         self.history_csv_path = 'equation_history.csv'
+        self.history_store = HistoryStore('equation_history.db', legacy_csv_path=self.history_csv_path)
+        self.expr_cache = ExpressionCache(persist_path='expression_cache.json', load=False)
+        self.profile_startup = False
+        self._startup_pending = {"graph panel", "history", "sympy"}
+        self.history_loaded = False
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.scene = None  # built with the graph panel
+        self.frame_cache = FrameCache()
+        self._frame_lock = threading.Lock()  # sweeps run on worker threads
+        self.param_range = (-5.0, 5.0)
+        self.param_count = 101  # slider positions per parameter
+        self.animation_fps = 20
+        self.param_curve = None  # the curve the parameter sliders drive
+        self.param_vars = {}
+        self._param_pending = None
+        self._param_busy = False
+        self._animation = None
+        self.tile_cache = TileCache()
+        self.tile_pool = None  # started with the first 2D plot
+        self._field_poll = None
+        self.sample_tolerance = 1e-3  # max chord deviation as a fraction of the y-range
+        # Dense curves keep their detail; the decimation pyramid hands matplotlib screen-resolution data
+        self.sample_budget = 200000
+        self.profiler = Profiler()
+        self.resampler = ViewportResampler(self.root, self.apply_resampled, profiler=self.profiler)
+        self.eval_timeout = 5.0  # seconds before a parse/compile/evaluate job is killed
+        self.eval_memory_mb = 1024  # per-job memory cap; only enforced on Linux
+        self.sandbox = None
+        self._plot_job = None
+        self._plot_job_counter = 0
+        self.canvas = None
         self.create_styles()
+        mark_startup("create styles")
         self.create_widgets()
-        self.load_history_csv()
-        self.update_history_list()
+        mark_startup("create widgets")
         self.load_example("x^2")
         self._drag_start_x = None
         self._drag_start_y = None
+        # Everything else waits until the window has been painted once
+        self.root.after_idle(self._deferred_startup)
+
+    def _deferred_startup(self):
+        # Wait until the window is mapped and drawn before calling it painted
+        self.root.wait_visibility()
+        self.root.update_idletasks()
+        mark_startup("first paint")
+        self.run_in_background(self._read_history, self._history_loaded, self._history_failed)
+        self.run_in_background(self.expr_cache.read_persisted, self._sympy_ready, self._sympy_failed)
+        # matplotlib and TkAgg load in a later callback so the painted window stays responsive
+        self.root.after(10, self._build_graph_panel)
+
+    def _build_graph_panel(self):
+        self.create_graph_panel()
+        self._startup_done("graph panel")
+        self.ensure_sandbox()
+
+    def run_in_background(self, work, done, failed=None, poll_ms=30):
+        # Run work() on a daemon thread and hand its result to done() on the Tk thread. If work()
+        # raises, the exception goes to failed() instead, or is shown in the status bar
+        state = {}
+        def target():
+            try:
+                state["result"] = work()
+            except Exception as e:
+                state["error"] = e
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        def poll():
+            if thread.is_alive():
+                self.root.after(poll_ms, poll)
+            elif "error" in state:
+                if failed is not None:
+                    failed(state["error"])
+                else:
+                    self.show_message(f"Background task failed: {state['error']}", error=True)
+            else:
+                done(state["result"])
+        self.root.after(poll_ms, poll)
+
+    def _startup_done(self, stage):
+        mark_startup(stage)
+        self._startup_pending.discard(stage)
+        if not self._startup_pending and self.profile_startup:
+            print_startup_report()
+
+    def ensure_sandbox(self):
+        if self.sandbox is None:
+            self.sandbox = EvaluationSandbox(timeout=self.eval_timeout, memory_mb=self.eval_memory_mb)
+        return self.sandbox
+
+    def _read_history(self):
+        # Runs on a worker thread, so it reads through its own connection
+        conn = sqlite3.connect(self.history_store.db_path)
+        try:
+            items = self.history_store.load_all(conn=conn)
+        finally:
+            conn.close()
+        return items, HistoryIndex(items)
+
+    def _history_loaded(self, result):
+        items, index = result
+        if self.history_loaded:
+            self._startup_done("history")
+            return  # cleared or re-imported while loading
+        # Keep anything plotted while the load was running
+        last_id = items[-1]['id'] if items else 0
+        extra = [item for item in self.history if item['id'] > last_id]
+        for item in extra:
+            index.add(item)
+        self.history = items + extra
+        self.history_index = index
+        self.history_loaded = True
+        self.apply_history_filter()
+        self._startup_done("history")
+
+    def _history_failed(self, error):
+        # Carry on with an empty history; plots from this session are still recorded
+        self.history_loaded = True
+        self.show_message(f"Could not load history: {error}", error=True)
+        self._startup_done("history")
+
+    def _sympy_ready(self, entries):
+        self.expr_cache.add_persisted(entries)
+        self._startup_done("sympy")
+
+    def _sympy_failed(self, error):
+        self.show_message(f"Could not load saved expressions: {error}", error=True)
+        self._startup_done("sympy")
 
     def create_styles(self):
         self.style = ttk.Style()
@@ -81,6 +287,11 @@ class EquationGrapherApp:
         self.equation_entry = ttk.Entry(self.control_frame, textvariable=self.equation_var, width=28, style="TEntry")
         self.equation_entry.pack(fill="x", pady=(0,10))
         self.equation_entry.bind("<Return>", lambda e: self.plot_equation())
+        mode_frame = ttk.Frame(self.control_frame)
+        mode_frame.pack(fill="x", pady=(0,6))
+        self.plot_mode_var = tk.StringVar(value="curve")
+        for col, (text, mode) in enumerate([("y = f(x)", "curve"), ("f(x, y) = 0", "implicit"), ("Heatmap", "heatmap")]):
+            ttk.Radiobutton(mode_frame, text=text, variable=self.plot_mode_var, value=mode).grid(row=0, column=col, padx=(0,8))
 
         range_frame = ttk.Frame(self.control_frame)
         range_frame.pack(fill="x", pady=(6,10))
@@ -104,6 +315,20 @@ class EquationGrapherApp:
 
         self.plot_button = ttk.Button(self.control_frame, text="📈 Plot Graph", command=self.plot_equation, style="Primary.TButton")
         self.plot_button.pack(fill="x", pady=(8,6))
+        # Shown only while the sandbox is working on a plot
+        self.busy_bar = ttk.Progressbar(self.control_frame, mode="indeterminate")
+        # Shown when the plotted equation has free parameters besides x; rows are built per curve
+        self.param_frame = ttk.LabelFrame(self.control_frame, text="🎚 Parameters", padding=6)
+        self.param_rows = ttk.Frame(self.param_frame)
+        self.param_rows.pack(fill="x")
+        anim_frame = ttk.Frame(self.param_frame)
+        anim_frame.pack(fill="x", pady=(6,0))
+        self.animate_var = tk.StringVar()
+        self.animate_combo = ttk.Combobox(anim_frame, textvariable=self.animate_var, width=6, state="readonly")
+        self.animate_combo.pack(side="left")
+        self.play_button = ttk.Button(anim_frame, text="▶ Play", command=self.toggle_animation, style="Accent.TButton")
+        self.play_button.pack(side="left", padx=4)
+        ttk.Button(anim_frame, text="Export…", command=self.export_animation, style="Accent.TButton").pack(side="left", padx=4)
 
         theme_frame = ttk.Frame(self.control_frame)
         theme_frame.pack(fill="x", pady=(12,6))
@@ -124,44 +349,80 @@ class EquationGrapherApp:
 
         hist_title = ttk.Label(self.control_frame, text="📚 History", style="Header.TLabel")
         hist_title.pack(anchor="center", pady=(12,6))  # ** Centered **
+        search_frame = ttk.Frame(self.control_frame)
+        search_frame.pack(fill="x", pady=(0,6))
+        self.history_search_var = tk.StringVar()
+        self.history_prefix_var = tk.BooleanVar(value=False)
+        self.history_x_from_var = tk.StringVar()
+        self.history_x_to_var = tk.StringVar()
+        self.history_date_from_var = tk.StringVar()
+        self.history_date_to_var = tk.StringVar()
+        self.history_count_var = tk.StringVar()
+        ttk.Label(search_frame, text="🔍").grid(row=0, column=0, sticky="w")
+        ttk.Entry(search_frame, textvariable=self.history_search_var, width=18).grid(row=0, column=1, columnspan=3, sticky="ew", padx=(4,0))
+        ttk.Checkbutton(search_frame, text="Prefix", variable=self.history_prefix_var,
+                        command=self.apply_history_filter).grid(row=0, column=4, padx=(6,0))
+        ttk.Label(search_frame, textvariable=self.history_count_var, foreground="#666").grid(row=0, column=5, padx=(6,0))
+        ttk.Label(search_frame, text="X ≥").grid(row=1, column=0, sticky="w", pady=(4,0))
+        ttk.Entry(search_frame, textvariable=self.history_x_from_var, width=6).grid(row=1, column=1, sticky="w", padx=(4,0), pady=(4,0))
+        ttk.Label(search_frame, text="X ≤").grid(row=1, column=2, sticky="e", padx=(6,0), pady=(4,0))
+        ttk.Entry(search_frame, textvariable=self.history_x_to_var, width=6).grid(row=1, column=3, sticky="w", padx=(4,0), pady=(4,0))
+        ttk.Label(search_frame, text="From").grid(row=2, column=0, sticky="w", pady=(4,0))
+        ttk.Entry(search_frame, textvariable=self.history_date_from_var, width=11).grid(row=2, column=1, sticky="w", padx=(4,0), pady=(4,0))
+        ttk.Label(search_frame, text="To").grid(row=2, column=2, sticky="e", padx=(6,0), pady=(4,0))
+        ttk.Entry(search_frame, textvariable=self.history_date_to_var, width=11).grid(row=2, column=3, sticky="w", padx=(4,0), pady=(4,0))
+        search_frame.columnconfigure(1, weight=1)
+        for var in (self.history_search_var, self.history_x_from_var, self.history_x_to_var,
+                    self.history_date_from_var, self.history_date_to_var):
+            var.trace_add("write", lambda *args: self.schedule_history_filter())
+
+        # The listbox only ever holds the rows currently on screen; the scrollbar is driven by
+        # history_offset over history_view_ids rather than by the listbox itself.
         self.history_frame = ttk.Frame(self.control_frame, style="History.TFrame", padding=6)
         self.history_frame.pack(fill="both", expand=True)
-        self.history_listbox = tk.Listbox(self.history_frame, height=8, font=("Courier New", 11), bg="#fffaf0")
+        self.history_listbox = tk.Listbox(self.history_frame, height=8, font=("Courier New", 11), bg="#fffaf0",
+                                          exportselection=False)
         self.history_listbox.pack(side="left", fill="both", expand=True)
         self.history_listbox.bind("<<ListboxSelect>>", self.on_history_select)
-        scrollbar = ttk.Scrollbar(self.history_frame, orient="vertical", command=self.history_listbox.yview)
-        scrollbar.pack(side="right", fill="y")
-        self.history_listbox.config(yscrollcommand=scrollbar.set)
+        self.history_listbox.bind("<Configure>", lambda e: self.render_history_window())
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.history_listbox.bind(seq, self.on_history_wheel)
+        self._history_line_height = max(tkfont.Font(font=self.history_listbox.cget("font")).metrics("linespace"), 1)
+        self.history_scrollbar = ttk.Scrollbar(self.history_frame, orient="vertical", command=self.on_history_scroll)
+        self.history_scrollbar.pack(side="right", fill="y")
         hist_btns = ttk.Frame(self.control_frame)
         hist_btns.pack(fill="x", pady=(8,0))
         ttk.Button(hist_btns, text="Delete", command=self.delete_selected_history, style="Accent.TButton").pack(side="left", padx=4)
         ttk.Button(hist_btns, text="Clear All", command=self.clear_history, style="Accent.TButton").pack(side="left", padx=4)
-        ttk.Button(hist_btns, text="Save Excel", command=self.save_history_to_excel, style="Primary.TButton").pack(side="left", padx=4)
+        ttk.Button(hist_btns, text="Import…", command=self.import_history, style="Primary.TButton").pack(side="left", padx=4)
+        ttk.Button(hist_btns, text="Export…", command=self.export_history, style="Primary.TButton").pack(side="left", padx=4)
+        # Shown only while an export is running
+        self.export_frame = ttk.Frame(self.control_frame)
+        self.export_progress = ttk.Progressbar(self.export_frame, mode="determinate", maximum=100)
+        self.export_progress.pack(side="left", fill="x", expand=True, padx=(4,6))
+        ttk.Button(self.export_frame, text="Cancel", command=self.cancel_export, style="Accent.TButton").pack(side="right", padx=4)
 
         self.message_var = tk.StringVar()
         self.message_label = ttk.Label(self.control_frame, textvariable=self.message_var, font=("Segoe UI", 10, "italic"))
         self.message_label.pack(pady=(8,2))
-
-        self.create_graph_panel()
+        self.cache_stats_var = tk.StringVar()
+        ttk.Label(self.control_frame, textvariable=self.cache_stats_var, font=("Segoe UI", 9), foreground="#666").pack(pady=(0,2))
 
     def _draw_gradient_header(self, canvas, *colors):
-        canvas_width = max(canvas.winfo_reqwidth(), 1200)
-        steps = 200
-        w = canvas_width / steps
-        for i in range(steps):
-            t = i / (steps - 1)
+        # One image, one pixel column per colour step, instead of hundreds of canvas items
+        canvas_width = max(canvas.winfo_reqwidth(), self.root.winfo_screenwidth(), 1200)
+        c1, c2, c3 = (self._hex_to_rgb(c) for c in colors[:3])
+        row = []
+        for i in range(canvas_width):
+            t = i / (canvas_width - 1)
             if t < 0.5:
-                a = t * 2
-                c1 = self._hex_to_rgb(colors[0])
-                c2 = self._hex_to_rgb(colors[1])
-                rgb = self._interp_rgb(c1, c2, a)
+                rgb = self._interp_rgb(c1, c2, t * 2)
             else:
-                a = (t - 0.5) * 2
-                c2 = self._hex_to_rgb(colors[1])
-                c3 = self._hex_to_rgb(colors[2])
-                rgb = self._interp_rgb(c2, c3, a)
-            hexc = self._rgb_to_hex(rgb)
-            canvas.create_rectangle(i*w, 0, (i+1)*w, 80, outline=hexc, fill=hexc)
+                rgb = self._interp_rgb(c2, c3, (t - 0.5) * 2)
+            row.append(self._rgb_to_hex(rgb))
+        self._header_image = tk.PhotoImage(width=canvas_width, height=80)
+        self._header_image.put("{" + " ".join(row) + "}", to=(0, 0, canvas_width, 80))
+        canvas.create_image(0, 0, image=self._header_image, anchor="nw")
 
     def _hex_to_rgb(self, h):
         h = h.lstrip('#')
@@ -172,50 +433,42 @@ class EquationGrapherApp:
         return (a[0] + (b[0]-a[0])*t, a[1] + (b[1]-a[1])*t, a[2] + (b[2]-a[2])*t)
 
     def create_graph_panel(self):
-        self.fig, self.ax = plt.subplots(figsize=(7,5))
-        self.apply_plot_style(dark=True)
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        self.fig = Figure(figsize=(7,5))
+        self.ax = self.fig.add_subplot()
+        self.scene = PlotScene(self.fig, self.ax, dark=(self.theme_var.get()=="dark"))
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
+        # draw_idle ends up in canvas.draw, so timing it here covers every redraw
+        untimed_draw = self.canvas.draw
+        def timed_draw(*args, **kwargs):
+            with self.profiler.span("canvas draw"):
+                untimed_draw(*args, **kwargs)
+            self.profiler.frame()
+        self.canvas.draw = timed_draw
         self.canvas.draw()
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(fill="both", expand=True)
         overlay = tk.Frame(self.plot_frame, bg="", bd=0)
         overlay.place(relx=0.01, rely=0.01, anchor="nw")
         ttk.Button(overlay, text="🗑 Clear", command=self.clear_graph, style="Accent.TButton").pack(side="left", padx=6)
+        ttk.Button(overlay, text="✕ Remove", command=self.remove_curve, style="Accent.TButton").pack(side="left", padx=6)
+        self.perf_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(overlay, text="⏱ Perf", variable=self.perf_var, command=self.toggle_perf_overlay).pack(side="left", padx=6)
+        ttk.Button(overlay, text="Save Trace", command=self.save_trace, style="Accent.TButton").pack(side="left", padx=6)
+        self.perf_label = tk.Label(self.plot_frame, font=("Courier New", 9), justify="left", anchor="nw",
+                                   bg="#0f1724", fg="#9fe0ff", padx=6, pady=4)
         self.canvas.mpl_connect("scroll_event", self.on_scroll)
         self.canvas.mpl_connect("button_press_event", self.on_button_press)
         self.canvas.mpl_connect("button_release_event", self.on_button_release)
         self.canvas.mpl_connect("motion_notify_event", self.on_motion)
 
-    def apply_plot_style(self, dark=True):
-        if dark:
-            self.fig.patch.set_facecolor('#0f1724')
-            self.ax.set_facecolor('#071428')
-            tick_color = 'white'
-            spine_color = 'white'
-            title_color = 'white'
-            grid_col = '#1f2a44'
-        else:
-            self.fig.patch.set_facecolor('#ffffff')
-            self.ax.set_facecolor('#f7fbff')
-            tick_color = '#222222'
-            spine_color = '#222222'
-            title_color = '#14213d'
-            grid_col = '#e6e9ef'
-        self.ax.clear()
-        self.ax.tick_params(colors=tick_color)
-        for side in ['bottom','top','left','right']:
-            self.ax.spines[side].set_color(spine_color)
-        self.ax.xaxis.label.set_color(tick_color)
-        self.ax.yaxis.label.set_color(tick_color)
-        self.ax.title.set_color(title_color)
-        self.ax.grid(True, color=grid_col)
-
     def apply_theme(self):
+        if self.canvas is None:
+            return  # the graph panel picks up theme_var when it is built
         theme = self.theme_var.get()
-        if theme == "dark":
-            self.apply_plot_style(dark=True)
-        else:
-            self.apply_plot_style(dark=False)
+        # Restyle the existing artists; plotted curves stay as they are
+        self.scene.set_theme(dark=(theme == "dark"))
         self.canvas.draw_idle()
         self.show_message(f"Applied {theme} theme")
 
@@ -239,64 +492,499 @@ class EquationGrapherApp:
         if min_x >= max_x:
             self.show_message("Min X must be less than Max X", error=True)
             return
-        eq_for_sympy = equation.replace('^', '**')
-        x = sp.symbols('x')
-        try:
-            expr = sp.sympify(eq_for_sympy)
-        except (sp.SympifyError, TypeError):
-            self.show_message("Invalid mathematical expression", error=True)
+        # Parse, compile and evaluate run in the sandbox process; a new plot cancels the previous one
+        self._plot_job_counter += 1
+        mode = self.plot_mode_var.get()
+        self._plot_job = {"id": self._plot_job_counter, "equation": equation, "min_x": min_x, "max_x": max_x,
+                          "color": self.line_color_var.get(), "mode": mode, "submitted": time.perf_counter()}
+        # Replotting a parametric curve keeps its slider values
+        previous = self.scene.find(equation) if self.scene and mode == "curve" else None
+        # A cached equation is sent along so the worker doesn't compile it again either
+        field = mode != "curve"
+        entry = self.expr_cache.export_entry(equation, field=field) if self.expr_cache.has_entry(equation, field=field) else None
+        self.ensure_sandbox().submit(self._plot_job["id"], equation, min_x, max_x, tol=self.sample_tolerance,
+                            max_points=self.sample_budget, want_entry=entry is None,
+                            profile=self.profiler.enabled, params=previous.params if previous else None,
+                            field=field, entry=entry)
+        self.set_busy(True)
+        self.show_message(f"Evaluating: {equation}…")
+        self.root.after(10, self._poll_plot_job)
+
+    def set_busy(self, busy):
+        if busy:
+            self.busy_bar.pack(fill="x", pady=(0,6), after=self.plot_button)
+            self.busy_bar.start(12)
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+
+    def _poll_plot_job(self):
+        job = self._plot_job
+        if job is None:
             return
-        x_vals = np.linspace(min_x, max_x, 1200)
-        f = sp.lambdify(x, expr, modules=["numpy"])
-        try:
-            y_vals = f(x_vals)
-        except Exception as e:
-            self.show_message(f"Error evaluating function: {e}", error=True)
+        result = self.sandbox.poll()
+        if result is None:
+            self.root.after(10, self._poll_plot_job)
+            return
+        job_id, status, payload = result
+        if job_id != job["id"]:
             return
-        y_vals = np.array(y_vals, dtype=np.complex128)
-        real_mask = np.isfinite(y_vals.real)
-        imag_mask = y_vals.imag == 0
-        mask = real_mask & imag_mask
-        if not np.any(mask):
+        self._plot_job = None
+        self.set_busy(False)
+        if status == "ok":
+            self._finish_plot(job, payload)
+        elif status == "parse":
+            self.show_message("Invalid mathematical expression", error=True)
+        elif status == "eval":
+            self.show_message(f"Error evaluating function: {payload}", error=True)
+        elif status == "timeout":
+            self.show_message(f"Evaluation took longer than {self.eval_timeout:g}s and was stopped", error=True)
+        elif status == "memory":
+            self.show_message(f"Evaluation exceeded the {self.eval_memory_mb} MB memory budget", error=True)
+        else:
+            self.show_message("Evaluation worker crashed; it has been restarted", error=True)
+
+    def _finish_plot(self, job, payload):
+        equation, min_x, max_x, color = job["equation"], job["min_x"], job["max_x"], job["color"]
+        x_plot, y_plot = payload["x"], payload["y"]
+        if payload["entry"] is not None:
+            expr, f = self.expr_cache.import_entry(*payload["entry"])
+        elif job["mode"] != "curve":
+            expr, f = self.expr_cache.get_field(equation)
+        else:
+            expr, f = self.expr_cache.get(equation)
+        self.update_cache_stats()
+        if not np.isfinite(y_plot).any():
             self.show_message("Function has no valid real outputs in this range", error=True)
             return
-        color = self.line_color_var.get()
+        if payload.get("stats"):
+            self.record_worker_stats(payload["stats"])
+        if job["mode"] != "curve":
+            self._finish_field(job, f)
+            return
         colorname = hex_to_name(color)  # Color name conversion
-        self.ax.plot(x_vals[mask], y_vals.real[mask], color=color, linewidth=2.2, label=equation)
-        self.ax.legend(loc="upper left", facecolor="#ffffff", framealpha=0.85, edgecolor=color, fontsize=10)
-        self.ax.set_title('Mathematical Function Graph', loc='center')
-        self.ax.set_xlabel('x')
-        self.ax.set_ylabel('f(x)')
+        with self.profiler.span("artists", equation=equation):
+            curve = self.scene.add(equation, f, x_plot, y_plot, color, self.ax.bbox.width,
+                                   params=payload.get("params"))
+        if curve.params:
+            self.show_parameters(curve)
         self.canvas.draw_idle()
+        self.profiler.add("plot total", job["submitted"], time.perf_counter() - job["submitted"])
         if not self.history or (self.history and self.history[-1]["equation"] != equation):
-            self.history.append({"equation": equation, "min_x": min_x, "max_x": max_x, "color": color,
-                                 "colorname": colorname, "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
-            self.update_history_list()
-            self.save_history_csv()
+            item = {"equation": equation, "min_x": min_x, "max_x": max_x, "color": color,
+                    "colorname": colorname, "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            self.history.append(self.history_store.append(item))
+            self.history_index.add(item)
+            if self.history_index.matches(item, **self.current_history_filter()):
+                self.history_view_ids.append(item['id'])
+            self.render_history_window()
+        self.show_message(f"Plotted: {equation}")
+
+    def _finish_field(self, job, f):
+        # The sandbox has compiled and spot-checked f(x, y); tiles are evaluated here on tile_pool
+        equation, mode = job["equation"], job["mode"]
+        with self.profiler.span("artists", equation=equation):
+            previous = self.scene.find_field(equation)
+            if previous is not None:
+                self.scene.remove_field(previous)
+            if self.tile_pool is None:
+                self.tile_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 2)
+            key = (mode, FIELD_PREFIX + normalize_equation(equation))
+            self.scene.add_field(TiledField(self.ax, equation, key, f, mode, job["color"], self.tile_cache,
+                                            self.tile_pool, profiler=self.profiler))
+            self.ax.set_xlim(job["min_x"], job["max_x"])
+            self.ax.set_ylim(job["min_x"], job["max_x"])
+            self.apply_lod()
+        self.refresh_fields()
+        self.canvas.draw_idle()
+        self.profiler.add("plot total", job["submitted"], time.perf_counter() - job["submitted"])
         self.show_message(f"Plotted: {equation}")
 
+    def refresh_fields(self):
+        # Draws cached tiles for the current view at once and queues the missing ones
+        if not self.scene.fields:
+            return
+        with self.profiler.span("tiles", fields=len(self.scene.fields)):
+            for field in self.scene.fields:
+                field.update_view(self.ax.get_xlim(), self.ax.get_ylim(), self.ax.bbox.width)
+        self._schedule_field_poll()
+
+    def _schedule_field_poll(self):
+        if self._field_poll is None and any(field.busy for field in self.scene.fields):
+            self._field_poll = self.root.after(30, self._poll_fields)
+
+    def _poll_fields(self):
+        self._field_poll = None
+        if any([field.collect() for field in self.scene.fields]):
+            self.canvas.draw_idle()
+        self._schedule_field_poll()
+
+    def record_worker_stats(self, stats):
+        pid = stats["pid"]
+        if stats["compile"] is not None:
+            start, parse_s, compile_s = stats["compile"]
+            self.profiler.add("parse", start, parse_s, pid=pid, tid=1)
+            self.profiler.add("compile", start + parse_s, compile_s, pid=pid, tid=1)
+        start = stats["sample_start"]
+        self.profiler.add("sample", start, stats["sample"], pid=pid, tid=1, args={"points": stats["points"]})
+        # evaluate and mask alternate inside the sampler; shown as two back-to-back totals
+        self.profiler.add("evaluate", start, stats["evaluate"], pid=pid, tid=1)
+        self.profiler.add("mask", start + stats["evaluate"], stats["mask"], pid=pid, tid=1)
+        self.profiler.count("points", stats["points"])
+
+    def toggle_perf_overlay(self):
+        self.profiler.enabled = self.perf_var.get()
+        if self.profiler.enabled:
+            self.perf_label.place(relx=0.99, rely=0.01, anchor="ne")
+            self.update_perf_overlay()
+        else:
+            self.perf_label.place_forget()
+
+    def update_perf_overlay(self):
+        if not self.profiler.enabled:
+            return
+        lines = [f"{'stage':<12}{'last':>9}{'avg':>9}"]
+        recent = self.profiler.recent()
+        for stage in ("parse", "compile", "evaluate", "mask", "artists", "lod", "canvas draw", "zoom", "pan",
+                      "resample", "tiles", "tile", "plot total"):
+            if stage in recent:
+                last, avg = recent[stage]
+                lines.append(f"{stage:<12}{last * 1000:7.1f}ms{avg * 1000:7.1f}ms")
+        lines.append(f"points {self.profiler.counters['points']:,}   fps {self.profiler.fps():.1f}")
+        self.perf_label.config(text="\n".join(lines))
+        self.root.after(250, self.update_perf_overlay)
+
+    def save_trace(self):
+        path = filedialog.asksaveasfilename(title="Save Trace", initialfile="grapher_trace.json",
+                                            defaultextension=".json", filetypes=[("Chrome trace", "*.json")])
+        if not path:
+            return
+        try:
+            count = self.profiler.export_chrome_trace(path)
+        except OSError as e:
+            self.show_message(f"Could not save trace: {e}", error=True)
+            return
+        self.show_message(f"Saved {count} trace events to {os.path.basename(path)}")
+
+    def schedule_resample(self):
+        if not self.scene:
+            return
+        self.resampler.request([(c.key, c.evaluator()) for c in self.scene], self.ax.get_xlim(), self.sample_budget,
+                               tol=self.sample_tolerance)
+
+    def apply_resampled(self, results):
+        x0, x1 = self.ax.get_xlim()
+        with self.profiler.span("lod", curves=len(self.scene)):
+            for curve in self.scene:
+                data = results.get(curve.key)
+                if data is not None:
+                    self.scene.set_data(curve, *data, x0, x1, self.ax.bbox.width)
+        self.canvas.draw_idle()
+
+    def apply_lod(self):
+        # Hand each line only the decimated points for the current view; full data stays in the scene
+        x0, x1 = self.ax.get_xlim()
+        with self.profiler.span("lod", curves=len(self.scene)):
+            self.scene.apply_lod(x0, x1, self.ax.bbox.width)
+
+    def update_cache_stats(self):
+        st = self.expr_cache.stats()
+        self.cache_stats_var.set(f"Cache: {st['hits']} hits • {st['misses']} misses • "
+                                 f"{st['evictions']} evicted • {st['time_saved']*1000:.0f} ms saved")
+
+    def on_close(self):
+        try:
+            self.expr_cache.save()
+        except OSError:
+            pass
+        self.history_store.close()
+        if self.sandbox is not None:
+            self.sandbox.close()
+        if self.tile_pool is not None:
+            self.tile_pool.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
     def clear_graph(self):
-        self.apply_plot_style(dark=(self.theme_var.get()=="dark"))
-        self.ax.clear()
-        self.apply_plot_style(dark=(self.theme_var.get()=="dark"))
-        self.ax.set_title('Mathematical Function Graph', loc='center')
-        self.ax.set_xlabel('x')
-        self.ax.set_ylabel('f(x)')
+        if self.canvas is None:
+            return
+        self.resampler.cancel()
+        self.scene.clear()
+        self.hide_parameters()
         self.canvas.draw_idle()
         self.show_message("Graph cleared")
 
-    def update_history_list(self):
-        self.history_listbox.delete(0, tk.END)
-        for item in self.history:
-            display = f"{item['equation']}  |  [{item['min_x']}, {item['max_x']}]  •  {item['timestamp']}"
-            self.history_listbox.insert(tk.END, display)
+    def remove_curve(self):
+        # Removes the curve for the equation in the entry box, or the most recent one
+        if self.canvas is None or not (self.scene.curves or self.scene.fields):
+            self.show_message("No curves to remove", error=True)
+            return
+        equation = self.equation_var.get().strip()
+        field = self.scene.find_field(equation)
+        if field is not None or not self.scene.curves:
+            field = field or self.scene.fields[-1]
+            self.scene.remove_field(field)
+            self.canvas.draw_idle()
+            self.show_message(f"Removed: {field.equation}")
+            return
+        curve = self.scene.find(equation) or self.scene.curves[-1]
+        self.scene.remove(curve)
+        if curve is self.param_curve:
+            self.hide_parameters()
+        self.canvas.draw_idle()
+        self.show_message(f"Removed: {curve.equation}")
+
+    def param_steps(self):
+        return [float(v) for v in np.round(np.linspace(*self.param_range, self.param_count), 10)]
+
+    def snap_param(self, value):
+        steps = self.param_steps()
+        return steps[int(np.argmin(np.abs(np.array(steps) - value)))]
+
+    def show_parameters(self, curve):
+        # One slider per free parameter of curve; they snap to param_steps so sweeps can be cached
+        self.stop_animation()
+        self.param_curve = curve
+        for child in self.param_rows.winfo_children():
+            child.destroy()
+        self.param_vars = {}
+        lo, hi = self.param_range
+        for row, (name, value) in enumerate(curve.params.items()):
+            value = curve.params[name] = self.snap_param(value)
+            var = tk.DoubleVar(value=value)
+            text = tk.StringVar(value=f"{value:.3g}")
+            self.param_vars[name] = (var, text)
+            ttk.Label(self.param_rows, text=name, width=4).grid(row=row, column=0, sticky="w")
+            ttk.Scale(self.param_rows, from_=lo, to=hi, variable=var,
+                      command=lambda v, n=name: self.on_param_change(n)).grid(row=row, column=1, sticky="ew", padx=4)
+            ttk.Label(self.param_rows, textvariable=text, width=6).grid(row=row, column=2, sticky="e")
+        self.param_rows.columnconfigure(1, weight=1)
+        self.animate_combo.config(values=list(curve.params))
+        self.animate_var.set(next(iter(curve.params)))
+        self.param_frame.config(text=f"🎚 Parameters: {curve.equation}")
+        self.param_frame.pack(fill="x", pady=(6,6), after=self.plot_button)
+
+    def hide_parameters(self):
+        self.stop_animation()
+        self.param_curve = None
+        self._param_pending = None
+        self.param_frame.pack_forget()
+
+    def _param_grid(self, curve):
+        # Uniform grid over the current view at two samples per pixel; the frame cache keys on it
+        x0, x1 = self.ax.get_xlim()
+        n = max(int(self.ax.bbox.width * 2), 200)
+        return (curve.equation, x0, x1, n), np.linspace(x0, x1, n)
+
+    def _param_sweep(self, curve, name):
+        # work() for run_in_background: all slider steps of name in one broadcast evaluation
+        key, x_vals = self._param_grid(curve)
+        func, params, steps = curve.func, dict(curve.params), self.param_steps()
+        def work():
+            try:
+                with self._frame_lock:
+                    return x_vals, steps, self.frame_cache.sweep(key, func, x_vals, params, name, steps), None
+            except Exception as e:
+                return x_vals, steps, None, e
+        return work
+
+    def show_frame(self, curve, x_vals, y_vals):
+        x0, x1 = self.ax.get_xlim()
+        with self.profiler.span("lod", curves=1):
+            self.scene.set_data(curve, x_vals, y_vals, x0, x1, self.ax.bbox.width)
+        self.canvas.draw_idle()
+
+    def on_param_change(self, name):
+        curve = self.param_curve
+        if curve is None:
+            return
+        var, text = self.param_vars[name]
+        value = self.snap_param(var.get())
+        text.set(f"{value:.3g}")
+        if curve.params[name] == value:
+            return
+        curve.params[name] = value
+        self.resampler.cancel()
+        # Scrubbing within an evaluated sweep is a cache lookup; anything else queues a sweep
+        if self._frame_lock.acquire(blocking=False):
+            try:
+                key, x_vals = self._param_grid(curve)
+                y_vals = self.frame_cache.frame(key, curve.params, name)
+            finally:
+                self._frame_lock.release()
+            if y_vals is not None:
+                self.show_frame(curve, x_vals, y_vals)
+                return
+        self._param_pending = (curve, name)
+        if not self._param_busy:
+            self._run_param_sweep()
+
+    def _run_param_sweep(self):
+        curve, name = self._param_pending
+        self._param_pending = None
+        self._param_busy = True
+        value = curve.params[name]
+        self.run_in_background(self._param_sweep(curve, name),
+                               lambda result: self._param_swept(curve, name, value, result))
+
+    def _param_swept(self, curve, name, value, result):
+        self._param_busy = False
+        x_vals, steps, frames, error = result
+        if error is not None:
+            self.show_message(f"Error evaluating function: {error}", error=True)
+        elif curve is self.param_curve and curve.params[name] == value:
+            self.show_frame(curve, x_vals, frames[steps.index(value)])
+        if self._param_pending is not None:
+            self._run_param_sweep()
+
+    def toggle_animation(self):
+        if self._animation is not None:
+            self.stop_animation()
+            return
+        curve, name = self.param_curve, self.animate_var.get()
+        if curve is None or name not in curve.params:
+            return
+        self._animation = {"curve": curve, "name": name, "after": None}
+        self.play_button.config(text="⏸ Pause")
+        self.resampler.cancel()
+        self.run_in_background(self._param_sweep(curve, name), self._animation_ready)
+
+    def _animation_ready(self, result):
+        animation = self._animation
+        if animation is None:
+            return
+        x_vals, steps, frames, error = result
+        if error is not None:
+            self.stop_animation()
+            self.show_message(f"Error evaluating function: {error}", error=True)
+            return
+        animation.update(x=x_vals, steps=steps, frames=frames,
+                         index=steps.index(animation["curve"].params[animation["name"]]))
+        self._animation_step()
+
+    def _animation_step(self):
+        # Plays the precomputed frames in a loop; nothing is evaluated while playing
+        animation = self._animation
+        curve, name = animation["curve"], animation["name"]
+        animation["index"] = i = (animation["index"] + 1) % len(animation["steps"])
+        value = curve.params[name] = animation["steps"][i]
+        var, text = self.param_vars[name]
+        var.set(value)
+        text.set(f"{value:.3g}")
+        self.show_frame(curve, animation["x"], animation["frames"][i])
+        animation["after"] = self.root.after(1000 // self.animation_fps, self._animation_step)
+
+    def stop_animation(self):
+        if self._animation is not None:
+            if self._animation["after"] is not None:
+                self.root.after_cancel(self._animation["after"])
+            self._animation = None
+            self.play_button.config(text="▶ Play")
+
+    def export_animation(self):
+        curve, name = self.param_curve, self.animate_var.get()
+        if curve is None or name not in curve.params:
+            self.show_message("Plot an equation with parameters first", error=True)
+            return
+        formats = animation_formats()
+        path = filedialog.asksaveasfilename(title="Export Animation", initialfile=f"sweep_{name}{formats[0][1]}",
+                                            defaultextension=formats[0][1],
+                                            filetypes=[(label, f"*{ext}") for label, ext in formats])
+        if not path:
+            return
+        sweep = self._param_sweep(curve, name)
+        color, label, dark, fps = curve.color, curve.equation, self.theme_var.get() == "dark", self.animation_fps
+        def work():
+            x_vals, steps, frames, error = sweep()
+            if error is not None:
+                raise error
+            return render_animation(x_vals, frames, steps, name, path, color, label, dark=dark, fps=fps)
+        self.show_message(f"Exporting {name} sweep…")
+        self.run_in_background(work,
+                               lambda count: self.show_message(f"Saved {count} frames to {os.path.basename(path)}"),
+                               lambda error: self.show_message(f"Could not export animation: {error}", error=True))
+
+    def history_display(self, item):
+        return f"{item['equation']}  |  [{item['min_x']}, {item['max_x']}]  •  {item['timestamp']}"
+
+    def current_history_filter(self):
+        def number(var):
+            try:
+                return float(var.get())
+            except ValueError:
+                return None
+        return {"text": self.history_search_var.get(), "prefix": self.history_prefix_var.get(),
+                "x_from": number(self.history_x_from_var), "x_to": number(self.history_x_to_var),
+                "date_from": self.history_date_from_var.get().strip(), "date_to": self.history_date_to_var.get().strip()}
+
+    def schedule_history_filter(self):
+        if self._history_filter_job is not None:
+            self.root.after_cancel(self._history_filter_job)
+        self._history_filter_job = self.root.after(150, self.apply_history_filter)
+
+    def apply_history_filter(self):
+        self._history_filter_job = None
+        self.history_view_ids = self.history_index.search(**self.current_history_filter())
+        self.history_offset = 0
+        self.render_history_window()
+
+    def _history_visible_rows(self):
+        height = self.history_listbox.winfo_height()
+        if height <= 1:
+            return int(self.history_listbox.cget("height"))
+        return max(height // self._history_line_height, 1)
+
+    def render_history_window(self):
+        rows = self._history_visible_rows()
+        total = len(self.history_view_ids)
+        self.history_offset = max(0, min(self.history_offset, total - rows))
+        visible_ids = self.history_view_ids[self.history_offset:self.history_offset + rows]
+        window = [self.history_display(self.history_index.get(i)) for i in visible_ids]
+        # Only touch rows whose text changed
+        for i, text in enumerate(window):
+            if i >= len(self._history_rows):
+                self.history_listbox.insert(tk.END, text)
+            elif self._history_rows[i] != text:
+                self.history_listbox.delete(i)
+                self.history_listbox.insert(i, text)
+        if len(self._history_rows) > len(window):
+            self.history_listbox.delete(len(window), tk.END)
+        self._history_rows = window
+        self.history_listbox.selection_clear(0, tk.END)
+        if self._history_selected_id in visible_ids:
+            self.history_listbox.selection_set(visible_ids.index(self._history_selected_id))
+        if total:
+            self.history_scrollbar.set(self.history_offset / total, min((self.history_offset + rows) / total, 1.0))
+        else:
+            self.history_scrollbar.set(0.0, 1.0)
+        self.history_count_var.set(f"{total}/{len(self.history_index)}")
+
+    def on_history_scroll(self, *args):
+        rows = self._history_visible_rows()
+        if args[0] == "moveto":
+            self.history_offset = int(float(args[1]) * len(self.history_view_ids))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.history_offset += step * rows if args[2] == "pages" else step
+        self.render_history_window()
+
+    def on_history_wheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.history_offset += -3 if up else 3
+        self.render_history_window()
+        return "break"
+
+    def _selected_history_id(self):
+        selection = self.history_listbox.curselection()
+        if not selection or self.history_offset + selection[0] >= len(self.history_view_ids):
+            return None
+        return self.history_view_ids[self.history_offset + selection[0]]
 
     def on_history_select(self, event):
-        sel = event.widget.curselection()
-        if not sel:
+        item_id = self._selected_history_id()
+        if item_id is None:
             return
-        idx = sel[0]
-        item = self.history[idx]
+        self._history_selected_id = item_id
+        item = self.history_index.get(item_id)
         self.equation_var.set(item["equation"])
         self.min_x_var.set(str(item["min_x"]))
         self.max_x_var.set(str(item["max_x"]))
@@ -305,61 +993,108 @@ class EquationGrapherApp:
         self.show_message("Loaded equation from history")
 
     def delete_selected_history(self):
-        selection = self.history_listbox.curselection()
-        if not selection:
+        item_id = self._selected_history_id()
+        if item_id is None:
             self.show_message("No history selected to delete", error=True)
             return
-        idx = selection[0]
-        del self.history[idx]
-        self.update_history_list()
-        self.save_history_csv()
+        self.history_store.delete(item_id)
+        del self.history[bisect.bisect_left(self.history, item_id, key=lambda h: h['id'])]
+        self.history_index.remove(item_id)
+        del self.history_view_ids[bisect.bisect_left(self.history_view_ids, item_id)]
+        self._history_selected_id = None
+        self.render_history_window()
         self.show_message("Deleted selected history")
 
     def clear_history(self):
         if messagebox.askyesno("Confirm Clear", "Clear all equation history?"):
+            self.history_store.clear()
+            self.history_loaded = True
             self.history.clear()
-            self.update_history_list()
-            self.save_history_csv()
+            self.history_index.clear()
+            self.history_view_ids = []
+            self._history_selected_id = None
+            self.render_history_window()
             self.show_message("Cleared all history")
 
-    def save_history_csv(self):
-        with open(self.history_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=['equation', 'min_x', 'max_x', 'color', 'colorname', 'timestamp'])
-            writer.writeheader()
-            for item in self.history:
-                writer.writerow({
-                    'equation': item['equation'],
-                    'min_x': item['min_x'],
-                    'max_x': item['max_x'],
-                    'color': item['color'],
-                    'colorname': item['colorname'],
-                    'timestamp': item['timestamp']
-                })
-
-    def load_history_csv(self):
-        if not os.path.exists(self.history_csv_path):
-            self.history = []
-            return
-        with open(self.history_csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            self.history = [
-                {
-                    'equation': row['equation'],
-                    'min_x': float(row['min_x']),
-                    'max_x': float(row['max_x']),
-                    'color': row['color'],
-                    'colorname': row.get('colorname', hex_to_name(row['color'])),
-                    'timestamp': row['timestamp']
-                } for row in reader
-            ]
-
-    def save_history_to_excel(self):
+    def import_history(self):
+        # Merges a CSV in the equation_history.csv layout (what Export… writes as CSV) into the
+        # history; rows already present are skipped
+        path = filedialog.askopenfilename(title="Import History", filetypes=[("CSV", "*.csv")])
+        if not path:
+            return
+        try:
+            self.history_store.import_csv(path)
+        except Exception as e:
+            self.show_message(f"Could not import history: {e}", error=True)
+            return
+        self.show_message(f"Importing history from {os.path.basename(path)}…")
+        self.run_in_background(self._read_history, lambda result: self._history_imported(path, result),
+                               lambda e: self.show_message(f"Could not reload history: {e}", error=True))
+
+    def _history_imported(self, path, result):
+        self.history, self.history_index = result
+        self.history_loaded = True
+        self._history_selected_id = None
+        self.apply_history_filter()
+        self.show_message(f"Imported history from {os.path.basename(path)}")
+
+    def export_history(self):
+        if self._export_thread is not None:
+            self.show_message("An export is already running", error=True)
+            return
         if not self.history:
-            self.show_message('No history to save in Excel')
+            self.show_message('No history to export')
             return
-        df = pd.DataFrame(self.history)
-        df.to_excel('equation_history.xlsx', index=False)
-        self.show_message('History saved to Excel (equation_history.xlsx)')
+        formats = available_formats()
+        path = filedialog.asksaveasfilename(title="Export History", initialfile="equation_history" + formats[0][1],
+                                            defaultextension=formats[0][1],
+                                            filetypes=[(name, "*" + ext) for name, ext in formats])
+        if not path:
+            return
+        self._export_cancel = threading.Event()
+        self._export_state = {"done": 0, "total": len(self.history), "result": None}
+
+        def progress(done, total):
+            self._export_state["done"] = done
+            self._export_state["total"] = total or 1
+
+        def run():
+            try:
+                rows = export_store(self.history_store, path, progress=progress, cancel=self._export_cancel)
+                self._export_state["result"] = ("ok", rows)
+            except ExportCancelled:
+                self._export_state["result"] = ("cancelled", None)
+            except Exception as e:
+                self._export_state["result"] = ("error", e)
+
+        self._export_path = path
+        self.export_progress["value"] = 0
+        self.export_frame.pack(fill="x", pady=(6,0), after=self.history_frame)
+        self._export_thread = threading.Thread(target=run, daemon=True)
+        self._export_thread.start()
+        self.show_message(f"Exporting history to {os.path.basename(path)}…")
+        self.root.after(100, self._poll_export)
+
+    def _poll_export(self):
+        state = self._export_state
+        self.export_progress["value"] = 100 * state["done"] / max(state["total"], 1)
+        if self._export_thread.is_alive():
+            self.root.after(100, self._poll_export)
+            return
+        self._export_thread = None
+        self.export_frame.pack_forget()
+        status, value = state["result"] or ("error", "export stopped unexpectedly")
+        name = os.path.basename(self._export_path)
+        if status == "ok":
+            self.show_message(f"Exported {value} entries to {name}")
+        elif status == "cancelled":
+            self.show_message("Export cancelled")
+        else:
+            self.show_message(f"Export failed: {value}", error=True)
+
+    def cancel_export(self):
+        if self._export_thread is not None:
+            self._export_cancel.set()
 
     def load_example(self, eq):
         self.equation_var.set(eq)
@@ -378,13 +1113,17 @@ class EquationGrapherApp:
         if xdata is None or ydata is None:
             return
         scale_factor = 1 / base_scale if event.button == 'up' else base_scale if event.button == 'down' else 1
-        new_width = (cur_xlim[1] - cur_xlim[0]) * scale_factor
-        new_height = (cur_ylim[1] - cur_ylim[0]) * scale_factor
-        relx = (cur_xlim[1] - xdata) / (cur_xlim[1] - cur_xlim[0])
-        rely = (cur_ylim[1] - ydata) / (cur_ylim[1] - cur_ylim[0])
-        self.ax.set_xlim([xdata - new_width * (1 - relx), xdata + new_width * relx])
-        self.ax.set_ylim([ydata - new_height * (1 - rely), ydata + new_height * rely])
-        self.canvas.draw_idle()
+        with self.profiler.span("zoom"):
+            new_width = (cur_xlim[1] - cur_xlim[0]) * scale_factor
+            new_height = (cur_ylim[1] - cur_ylim[0]) * scale_factor
+            relx = (cur_xlim[1] - xdata) / (cur_xlim[1] - cur_xlim[0])
+            rely = (cur_ylim[1] - ydata) / (cur_ylim[1] - cur_ylim[0])
+            self.ax.set_xlim([xdata - new_width * (1 - relx), xdata + new_width * relx])
+            self.ax.set_ylim([ydata - new_height * (1 - rely), ydata + new_height * rely])
+            self.apply_lod()
+            self.refresh_fields()
+            self.canvas.draw_idle()
+            self.schedule_resample()
 
     def on_button_press(self, event):
         if event.button == 1 and event.inaxes:
@@ -400,16 +1139,31 @@ class EquationGrapherApp:
     def on_motion(self, event):
         if self._drag_start_x is None or self._drag_start_y is None or event.x is None or event.y is None or not event.inaxes:
             return
-        dx = event.x - self._drag_start_x
-        dy = event.y - self._drag_start_y
-        dx_data = dx * (self._orig_xlim[1] - self._orig_xlim[0]) / self.canvas.get_tk_widget().winfo_width()
-        dy_data = dy * (self._orig_ylim[1] - self._orig_ylim[0]) / self.canvas.get_tk_widget().winfo_height()
-        self.ax.set_xlim(self._orig_xlim[0] - dx_data, self._orig_xlim[1] - dx_data)
-        self.ax.set_ylim(self._orig_ylim[0] + dy_data, self._orig_ylim[1] + dy_data)
-        self.canvas.draw_idle()
+        with self.profiler.span("pan"):
+            dx = event.x - self._drag_start_x
+            dy = event.y - self._drag_start_y
+            dx_data = dx * (self._orig_xlim[1] - self._orig_xlim[0]) / self.canvas.get_tk_widget().winfo_width()
+            dy_data = dy * (self._orig_ylim[1] - self._orig_ylim[0]) / self.canvas.get_tk_widget().winfo_height()
+            self.ax.set_xlim(self._orig_xlim[0] - dx_data, self._orig_xlim[1] - dx_data)
+            self.ax.set_ylim(self._orig_ylim[0] + dy_data, self._orig_ylim[1] + dy_data)
+            self.apply_lod()
+            self.refresh_fields()
+            self.canvas.draw_idle()
+            self.schedule_resample()
+
+def print_startup_report():
+    start = STARTUP_MARKS[0][1]
+    print("Startup profile (ms)        step    total")
+    prev = start
+    for label, t in STARTUP_MARKS[1:]:
+        print(f"  {label:<24}{(t - prev) * 1000:8.1f}{(t - start) * 1000:9.1f}")
+        prev = t
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     root = tk.Tk()
     root.geometry("1200x780")
+    mark_startup("create Tk root")
     app = EquationGrapherApp(root)
+    app.profile_startup = "--profile-startup" in sys.argv[1:]
     root.mainloop()
@@ -0,0 +1,136 @@
+# Batched evaluation for the parameter sliders. A compiled f(x, a, b, ...) is called once for a
+# whole sweep of one parameter by broadcasting a (values × 1) column against a (1 × x) row, and
+# each row of the result (one frame) is kept in an LRU cache, so scrubbing a slider, playing the
+# sweep as an animation and exporting it to GIF/MP4 all reuse the same evaluated frames.
+import os
+from collections import OrderedDict
+import numpy as np
+from grapher_core import EVAL_CHUNK, store_real, style_axes, label_axes
+
+def evaluate_family(f, x_vals, values, index=0, fixed=(), out=None, max_cells=EVAL_CHUNK * 16):
+    # Returns a (len(values), len(x_vals)) array with row i = f(x_vals, ..., values[i], ...), where
+    # values go in parameter slot `index` and the other parameters take `fixed` in order.
+    # Rows are evaluated in blocks of at most max_cells samples to bound numpy temporaries.
+    values = np.asarray(values, dtype=float)
+    if out is None:
+        out = np.empty((len(values), len(x_vals)))
+    rows = max(1, max_cells // max(len(x_vals), 1))
+    xs = x_vals[np.newaxis, :]
+    with np.errstate(all='ignore'):
+        for start in range(0, len(values), rows):
+            args = list(fixed)
+            args.insert(index, values[start:start + rows, np.newaxis])
+            store_real(f(xs, *args), out[start:start + rows])
+    return out
+
+class FrameCache:
+    # LRU of evaluated frames (1-D y arrays) bounded by total bytes
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def get(self, key):
+        y = self._frames.get(key)
+        if y is not None:
+            self._frames.move_to_end(key)
+        return y
+
+    def put(self, key, y):
+        if y.nbytes > self.max_bytes:
+            return
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._frames[key] = y
+        self._bytes += y.nbytes
+        while self._bytes > self.max_bytes:
+            _, old = self._frames.popitem(last=False)
+            self._bytes -= old.nbytes
+            self.evictions += 1
+
+    def _base(self, key, params, name):
+        return key + (name, tuple(v for p, v in params.items() if p != name))
+
+    def frame(self, key, params, name):
+        # The cached frame for the current parameter values, if a sweep over name produced it
+        return self.get(self._base(key, params, name) + (params[name],))
+
+    def sweep(self, key, f, x_vals, params, name, steps):
+        # Frames for params[name] taking each value in steps while the other parameters keep their
+        # values in the params dict. key identifies the curve and its x grid. Only the missing
+        # steps are evaluated, all in one broadcast call; returns a list of y arrays.
+        names = list(params)
+        base = self._base(key, params, name)
+        fixed = base[-1]
+        frames = {v: self.get(base + (v,)) for v in steps}
+        missing = [v for v, y in frames.items() if y is None]
+        self.hits += len(frames) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            ys = evaluate_family(f, x_vals, missing, names.index(name), fixed)
+            for v, y in zip(missing, ys):
+                frames[v] = y
+                self.put(base + (v,), y)
+        return [frames[v] for v in steps]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "frames": len(self._frames), "bytes": self._bytes}
+
+    def clear(self):
+        self._frames.clear()
+        self._bytes = 0
+
+def animation_formats():
+    formats = [('Animated GIF', '.gif')]
+    from matplotlib.animation import FFMpegWriter
+    if FFMpegWriter.isAvailable():
+        formats.append(('MP4 video', '.mp4'))
+    return formats
+
+def render_animation(x_vals, frames, values, name, path, color, label="", dark=True, fps=20,
+                     figsize=(7, 5), dpi=100):
+    # Write precomputed frames to a GIF (Pillow) or MP4 (ffmpeg) with the Agg backend; the
+    # format is taken from the extension. Nothing is re-evaluated here.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.animation import FuncAnimation, PillowWriter, FFMpegWriter
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.gif':
+        writer = PillowWriter(fps=fps)
+    elif ext == '.mp4':
+        if not FFMpegWriter.isAvailable():
+            raise ValueError("MP4 export needs ffmpeg on the PATH")
+        writer = FFMpegWriter(fps=fps)
+    else:
+        raise ValueError(f"Unsupported animation format: {ext or path}")
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    style_axes(fig, ax, dark=dark)
+    label_axes(ax)
+    finite = np.concatenate([y[np.isfinite(y)] for y in frames] + [np.zeros(0)])
+    if len(finite):
+        lo, hi = np.percentile(finite, [1, 99])
+        pad = (hi - lo) * 0.05 or 1.0
+        ax.set_ylim(lo - pad, hi + pad)
+    ax.set_xlim(x_vals[0], x_vals[-1])
+    line, = ax.plot(x_vals, frames[0], color=color, linewidth=2.2, label=label)
+    if label:
+        ax.legend(loc="upper left", facecolor="#ffffff", framealpha=0.85, edgecolor=color, fontsize=10)
+    caption = ax.text(0.98, 0.02, "", transform=ax.transAxes, ha="right", va="bottom",
+                      color='white' if dark else '#222222')
+    def update(i):
+        line.set_ydata(frames[i])
+        caption.set_text(f"{name} = {values[i]:.3g}")
+        return line, caption
+    animation = FuncAnimation(fig, update, frames=len(frames), blit=False)
+    animation.save(path, writer=writer, dpi=dpi)
+    return len(frames)
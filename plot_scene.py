@@ -0,0 +1,124 @@
+# Retained model of what is on the axes. Every plotted curve keeps its expression, compiled
+# callable, parameter values, sampled data (as a DecimationPyramid) and colour next to its
+# Line2D, so a theme change only restyles existing artists and adding or removing one curve
+# leaves the others alone. 2D plots (field_tiles.TiledField) are kept alongside in fields.
+from grapher_core import DecimationPyramid, style_axes, label_axes
+
+class Curve:
+    __slots__ = ("equation", "func", "params", "color", "lod", "line")
+
+    def __init__(self, equation, func, params, color, lod, line):
+        self.equation = equation
+        self.func = func  # f(x, *params.values())
+        self.params = params  # free parameter name -> current value, in argument order
+        self.color = color
+        self.lod = lod
+        self.line = line
+
+    @property
+    def key(self):
+        return id(self.line)
+
+    def evaluator(self):
+        # Callable of x alone, with the parameters bound at their current values
+        if not self.params:
+            return self.func
+        func, values = self.func, tuple(self.params.values())
+        return lambda x_vals: func(x_vals, *values)
+
+class PlotScene:
+    def __init__(self, fig, ax, dark=True):
+        self.fig = fig
+        self.ax = ax
+        self.dark = dark
+        self.curves = []
+        self.fields = []
+        style_axes(fig, ax, dark=dark)
+        label_axes(ax)
+
+    def __len__(self):
+        return len(self.curves)
+
+    def __iter__(self):
+        return iter(list(self.curves))
+
+    def find(self, equation):
+        for curve in self.curves:
+            if curve.equation == equation:
+                return curve
+        return None
+
+    def add(self, equation, func, x, y, color, pixels, params=None):
+        # Plotting an equation that is already on the axes replaces that curve's data and colour in place
+        lod = DecimationPyramid(x, y)
+        x0, x1 = (x[0], x[-1]) if len(x) else (0.0, 1.0)
+        curve = self.find(equation)
+        if curve is not None:
+            curve.func, curve.params, curve.color, curve.lod = func, dict(params or {}), color, lod
+            curve.line.set_data(*lod.view(x0, x1, pixels))
+            curve.line.set_color(color)
+            self.ax.relim()
+            self.ax.autoscale_view()
+        else:
+            line, = self.ax.plot(*lod.view(x0, x1, pixels), color=color, linewidth=2.2, label=equation)
+            curve = Curve(equation, func, dict(params or {}), color, lod, line)
+            self.curves.append(curve)
+        self.update_legend()
+        return curve
+
+    def find_field(self, equation):
+        for field in self.fields:
+            if field.equation == equation:
+                return field
+        return None
+
+    def add_field(self, field):
+        self.fields.append(field)
+        self.update_legend()
+        return field
+
+    def remove_field(self, field):
+        field.remove()
+        self.fields.remove(field)
+        self.update_legend()
+
+    def remove(self, curve):
+        curve.line.remove()
+        self.curves.remove(curve)
+        self.update_legend()
+
+    def clear(self):
+        for curve in self.curves:
+            curve.line.remove()
+        for field in self.fields:
+            field.remove()
+        self.curves = []
+        self.fields = []
+        # Forget the old extents and zoom, as ax.clear() did, so the next plot autoscales afresh
+        self.ax.relim()
+        self.ax.autoscale(True)
+        self.update_legend()
+
+    def set_data(self, curve, x, y, x0, x1, pixels):
+        curve.lod = DecimationPyramid(x, y)
+        curve.line.set_data(*curve.lod.view(x0, x1, pixels))
+
+    def apply_lod(self, x0, x1, pixels):
+        for curve in self.curves:
+            curve.line.set_data(*curve.lod.view(x0, x1, pixels))
+
+    def set_theme(self, dark):
+        # Only colours change: lines, limits and labels are kept as they are
+        self.dark = dark
+        style_axes(self.fig, self.ax, dark=dark)
+
+    def update_legend(self):
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        # heatmaps have no legend entry
+        labelled = self.curves + [f for f in self.fields if f.mode == "implicit"]
+        if labelled:
+            # edged in the colour of the most recent curve, as before
+            self.ax.legend(loc="upper left", facecolor="#ffffff", framealpha=0.85,
+                           edgecolor=labelled[-1].color, fontsize=10)
@@ -0,0 +1,17 @@
+# The modules live at the repository root next to the GUI script rather than in a package
+import os
+import sys
+import importlib.util
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope="session")
+def grapher_app():
+    # The GUI script, imported as a module; its name has spaces, so it is loaded from its path.
+    # Nothing creates a Tk root at import time, so this works without a display.
+    spec = importlib.util.spec_from_file_location("grapher_app", os.path.join(ROOT, "modified code 3.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,28 @@
+import numpy as np
+from grapher_core import ExpressionCache, adaptive_sample
+
+def _sample(equation, min_x=-5.0, max_x=5.0, **kwargs):
+    return adaptive_sample(ExpressionCache().get(equation)[1], min_x, max_x, **kwargs)
+
+def test_adaptive_sample_keeps_smooth_curves_coarse():
+    x, y = _sample("x^2")
+    assert len(x) == 129
+    assert np.allclose(y, x ** 2)
+
+def test_adaptive_sample_breaks_line_at_poles():
+    x, y = _sample("tan(x)")
+    assert np.all(np.diff(x) > 0)
+    for pole in (-3 * np.pi / 2, -np.pi / 2, np.pi / 2, 3 * np.pi / 2):
+        i = np.searchsorted(x, pole)
+        assert np.isnan(y[i - 1:i + 1]).any()
+    assert len(x) <= 4000 + 4  # budget plus one inserted NaN per break
+
+def test_adaptive_sample_refines_domain_edges():
+    x, y = _sample("sqrt(x)")
+    first = x[np.isfinite(y)][0]
+    assert 0 <= first < 1e-3
+    assert np.isnan(y[x < 0]).all()
+
+def test_adaptive_sample_respects_point_budget():
+    x, y = _sample("sin(1/x)", max_points=1000)
+    assert len(x) <= 1001
@@ -0,0 +1,44 @@
+import csv
+import pytest
+from batch_render import read_items, run_batch, write_report
+from grapher_core import render_equation
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["equation", "min_x", "max_x", "color", "timestamp"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_render_equation_writes_image(tmp_path):
+    path = tmp_path / "plot.png"
+    assert render_equation("sin(x)", -5, 5, "#ff0000", str(path)) > 0
+    assert path.read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+
+@pytest.mark.parametrize("equation,min_x,max_x", [("x", 1, 1), ("sqrt(x)", -5, -1), ("x+", -1, 1)])
+def test_render_equation_rejects_bad_input(tmp_path, equation, min_x, max_x):
+    with pytest.raises(Exception):
+        render_equation(equation, min_x, max_x, "#ff0000", str(tmp_path / "plot.png"))
+
+def test_read_items_flags_bad_ranges(tmp_path):
+    path = tmp_path / "in.csv"
+    _write_csv(path, [{"equation": "x", "min_x": "-1", "max_x": "1", "color": "", "timestamp": ""},
+                      {"equation": "x^2", "min_x": "a", "max_x": "1", "color": "#000000", "timestamp": ""}])
+    first, second = read_items(str(path))
+    assert first["color"] == "#6a11cb" and first["min_x"] == -1.0
+    assert second["min_x"] is None
+
+def test_run_batch_renders_across_processes_and_reports_failures(tmp_path):
+    items = [{"index": 0, "equation": "x^2", "min_x": -2.0, "max_x": 2.0, "color": "#ff0000"},
+             {"index": 1, "equation": "x+", "min_x": -2.0, "max_x": 2.0, "color": "#ff0000"},
+             {"index": 2, "equation": "cos(x)", "min_x": None, "max_x": None, "color": "#ff0000"},
+             {"index": 3, "equation": "tan(x)", "min_x": -2.0, "max_x": 2.0, "color": "#00ff00"}]
+    out = tmp_path / "renders"
+    results, stats = run_batch(items, str(out), fmt="svg", workers=2)
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert (stats["ok"], stats["failed"]) == (2, 2)
+    assert results[1]["error"] and results[2]["error"]
+    assert sorted(p.name for p in out.iterdir()) == ["00000_x_2.svg", "00003_tan_x.svg"]
+    report = tmp_path / "report.csv"
+    write_report(results, str(report))
+    with open(report, newline="") as f:
+        assert len(list(csv.DictReader(f))) == 4
@@ -0,0 +1,37 @@
+import json
+import importlib.util
+import benchmark
+
+def _result(stage, median_s, **extra):
+    return {"stage": stage, "case": "c", "size": 10, "median_s": median_s, **extra}
+
+def test_compare_flags_slowdowns_over_threshold():
+    baseline = {"results": [_result("a", 1.0), _result("b", 1.0), _result("c", 1e-6)]}
+    current = {"results": [_result("a", 1.2), _result("b", 1.05), _result("c", 5e-6), _result("new", 1.0)]}
+    report = {r["stage"]: r["regression"] for r in benchmark.compare(current, baseline, 0.1)}
+    assert report == {"a": True, "b": False, "c": False}  # c is below the noise floor
+
+def test_compare_ignores_skipped_entries():
+    skipped = {"stage": "excel export", "case": "xlsx", "size": 10, "skipped": "openpyxl is not installed"}
+    baseline = {"results": [_result("excel export", 1.0) | {"case": "xlsx"}]}
+    assert benchmark.compare({"results": [skipped]}, baseline, 0.1) == []
+
+def test_history_benchmark_records_every_stage():
+    results = []
+    benchmark.bench_history(results, [10], 1, skip_excel_above=10)
+    stages = [r["stage"] for r in results]
+    assert stages == ["history append", "history load", "history save csv", "history load csv", "excel export"]
+    excel = results[-1]
+    if importlib.util.find_spec("openpyxl") is None:
+        assert "skipped" in excel
+    else:
+        assert excel["median_s"] > 0
+
+def test_main_writes_results_and_compares(tmp_path):
+    out = tmp_path / "current.json"
+    assert benchmark.main(["--quick", "--repeats", "1", "--skip-pipeline", "--out", str(out)]) == 0
+    data = json.loads(out.read_text())
+    assert data["results"] and "numpy" in data["meta"]
+    again = tmp_path / "again.json"
+    assert benchmark.main(["--quick", "--repeats", "1", "--skip-pipeline", "--out", str(again),
+                           "--compare", str(out), "--threshold", "1000"]) == 0
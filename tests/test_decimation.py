@@ -0,0 +1,43 @@
+import numpy as np
+from grapher_core import DecimationPyramid
+
+def test_decimation_pyramid_keeps_short_curves_as_is():
+    x = np.linspace(0, 1, 50)
+    lod = DecimationPyramid(x, x)
+    assert not lod.levels
+    xv, yv = lod.view(0, 1, 1000)
+    assert np.array_equal(xv, x)
+
+def test_decimation_pyramid_decimates_large_input_to_screen_resolution():
+    n = 2_000_000
+    x = np.linspace(0, 10, n)
+    y = np.sin(2000 * x) + x / 10
+    y[n // 3] = np.nan
+    lod = DecimationPyramid(x, y)
+    xv, yv = lod.view(0, 10, 1000)
+    assert len(xv) <= 6 * 2 * 1000 * 2  # six points per block, blocks about a pixel wide
+    assert np.all(np.diff(xv) >= 0)
+    assert np.nanmax(yv) == np.nanmax(y) and np.nanmin(yv) == np.nanmin(y)
+    assert np.isnan(yv).any()  # the discontinuity survives
+    # Zooming in picks a finer level over just the visible range, then the raw samples
+    xz, _ = lod.view(1.0, 2.0, 1000)
+    assert len(xz) <= 6 * 2 * 1000 * 2 and xz.min() >= 0.99 and xz.max() <= 2.01
+    xr, yr = lod.view(1.0, 1.01, 1000)
+    i0 = np.searchsorted(x, 1.0) - 1
+    assert np.array_equal(yr, y[i0:i0 + len(yr)])
+
+def test_decimation_pyramid_keeps_sparse_samples_on_non_uniform_x():
+    # Adaptive sampling packs samples where the curve is busy and spreads them elsewhere; a
+    # block over the sparse part spans many pixel columns and must not collapse into a chord.
+    dense = np.linspace(0, 1, 1_000_000, endpoint=False)
+    sparse = np.linspace(1, 10, 300)
+    x = np.concatenate([dense, sparse])
+    y = np.concatenate([np.sin(5000 * dense), np.sin(3 * sparse)])
+    lod = DecimationPyramid(x, y)
+    xv, yv = lod.view(0, 10, 1000)
+    assert np.all(np.diff(xv) > 0)
+    assert np.isin(sparse, xv).all()
+    assert len(xv) <= 6 * 2 * 1000 * 2 + len(sparse)
+    assert np.nanmax(yv) == np.nanmax(y) and np.nanmin(yv) == np.nanmin(y)
+    # The drawn line follows the sparse curve instead of cutting across it
+    assert np.allclose(np.interp(sparse, xv, yv), np.sin(3 * sparse))
@@ -0,0 +1,103 @@
+import threading
+import time
+import multiprocessing as mp
+import numpy as np
+import pytest
+import eval_sandbox
+from grapher_core import ExpressionCache
+from eval_sandbox import EvaluationSandbox
+
+def _wait(sandbox, limit=60.0):
+    deadline = time.monotonic() + limit
+    while time.monotonic() < deadline:
+        result = sandbox.poll()
+        if result is not None:
+            return result
+        time.sleep(0.02)
+    raise AssertionError("sandbox did not answer")
+
+@pytest.fixture(scope="module")
+def sandbox():
+    sandbox = EvaluationSandbox(timeout=20.0, memory_mb=64)
+    yield sandbox
+    sandbox.close()
+
+def test_sandbox_samples_curve_and_exports_entry(sandbox):
+    sandbox.submit(1, "x^2", -1.0, 1.0)
+    job_id, status, payload = _wait(sandbox)
+    assert (job_id, status) == (1, "ok")
+    assert np.allclose(payload["y"], payload["x"] ** 2)
+    expr, f = ExpressionCache().import_entry(*payload["entry"])
+    assert f(3.0) == 9.0
+
+def test_sandbox_binds_parameters(sandbox):
+    sandbox.submit(2, "a*x", 0.0, 1.0, params={"a": 3.0})
+    _, status, payload = _wait(sandbox)
+    assert status == "ok" and payload["params"] == {"a": 3.0}
+    assert np.allclose(payload["y"], 3 * payload["x"])
+
+def test_sandbox_reports_parse_errors(sandbox):
+    sandbox.submit(3, "x+", 0.0, 1.0)
+    assert _wait(sandbox)[1] == "parse"
+
+def test_sandbox_stops_runaway_memory(sandbox):
+    sandbox.submit(4, "2**(2**40)", 0.0, 1.0)
+    assert _wait(sandbox)[1] == "memory"
+
+def test_sandbox_checks_fields_on_a_grid(sandbox):
+    sandbox.submit(5, "x^2 + y^2 = 1", -1.0, 1.0, field=True)
+    _, status, payload = _wait(sandbox)
+    assert status == "ok"
+    assert payload["y"].shape == (33, 33)
+    assert payload["entry"][0] == "field:x**2+y**2=1"
+
+def test_sandbox_times_out_and_recovers():
+    sandbox = EvaluationSandbox(timeout=1.0)
+    try:
+        sandbox.submit(1, "factorial(10**9)*x", 0.0, 1.0)
+        assert _wait(sandbox)[1] == "timeout"
+        sandbox.timeout = 30.0  # the replacement worker is still importing sympy
+        sandbox.submit(2, "x", 0.0, 1.0)
+        assert _wait(sandbox)[:2] == (2, "ok")
+    finally:
+        sandbox.close()
+
+def test_worker_exports_entries_the_cache_did_not_keep(monkeypatch):
+    # An entry over the byte budget is never stored; it is still handed back so the GUI
+    # doesn't have to compile the equation again on the Tk thread
+    monkeypatch.setattr(eval_sandbox, "ExpressionCache", lambda: ExpressionCache(max_bytes=1))
+    monkeypatch.setattr(eval_sandbox, "_limit_memory", lambda memory_mb: None)
+    parent, child = mp.Pipe()
+    worker = threading.Thread(target=eval_sandbox._worker_main, args=(child, 0), daemon=True)
+    worker.start()
+    try:
+        parent.send((1, "x^2", 0.0, 1.0, 1e-3, 4000, True, False, {}, False, None))
+        assert parent.poll(30)
+        job_id, status, payload = parent.recv()
+        assert status == "ok" and payload["entry"][0] == "x**2"
+        assert ExpressionCache().import_entry(*payload["entry"])[1](3.0) == 9.0
+        parent.send((2, "x*y", 0.0, 1.0, 1e-3, 4000, True, False, {}, True, None))
+        assert parent.poll(30)
+        _, status, payload = parent.recv()
+        assert status == "ok" and payload["entry"][0] == "field:x*y"
+    finally:
+        parent.send(None)
+        worker.join(5)
+
+def test_worker_uses_the_entry_sent_with_the_job(monkeypatch):
+    monkeypatch.setattr(eval_sandbox, "_limit_memory", lambda memory_mb: None)
+    gui_cache = ExpressionCache()
+    gui_cache.get("x^3")
+    parent, child = mp.Pipe()
+    worker = threading.Thread(target=eval_sandbox._worker_main, args=(child, 0), daemon=True)
+    worker.start()
+    try:
+        parent.send((1, "x^3", 0.0, 1.0, 1e-3, 4000, False, True, {}, False, gui_cache.export_entry("x^3")))
+        assert parent.poll(30)
+        _, status, payload = parent.recv()
+        assert status == "ok" and payload["entry"] is None
+        assert payload["stats"]["compile"] is None  # rebuilt from the GUI's entry, not compiled
+        assert np.allclose(payload["y"], payload["x"] ** 3)
+    finally:
+        parent.send(None)
+        worker.join(5)
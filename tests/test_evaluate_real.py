@@ -0,0 +1,34 @@
+import numpy as np
+from grapher_core import evaluate_real
+
+def test_evaluate_real_stays_float64_for_real_results():
+    x = np.linspace(-1, 1, 11)
+    y = evaluate_real(np.exp, x)
+    assert y.dtype == np.float64
+    assert np.array_equal(y, np.exp(x))
+
+def test_evaluate_real_masks_complex_and_infinite_samples():
+    x = np.array([-4.0, 0.0, 4.0])
+    y = evaluate_real(lambda v: np.sqrt(v.astype(complex)), x)
+    assert np.isnan(y[0]) and y[1] == 0.0 and y[2] == 2.0
+    with np.errstate(divide='ignore'):
+        y = evaluate_real(lambda v: 1 / v, x)
+    assert np.isnan(y[1]) and y[2] == 0.25
+
+def test_evaluate_real_broadcasts_scalars_and_chunks():
+    x = np.arange(10.0)
+    assert np.array_equal(evaluate_real(lambda v: 5, x), np.full(10, 5.0))
+    calls = []
+    def f(v):
+        calls.append(len(v))
+        return v * 2
+    assert np.array_equal(evaluate_real(f, x, chunk_size=4), x * 2)
+    assert calls == [4, 4, 2]
+
+def test_evaluate_real_accumulates_stage_stats():
+    stats = {}
+    x = np.arange(10.0)
+    evaluate_real(np.sin, x, chunk_size=4, stats=stats)
+    evaluate_real(np.sin, x, stats=stats)
+    assert stats["points"] == 20
+    assert stats["evaluate"] >= 0 and stats["mask"] >= 0
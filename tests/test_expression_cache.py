@@ -0,0 +1,90 @@
+import json
+import pickle
+import numpy as np
+import pytest
+from grapher_core import ExpressionCache, normalize_equation
+
+def test_normalize_equation_rewrites_power_and_whitespace():
+    assert normalize_equation("x ^ 2 + 1") == "x**2+1"
+
+def test_expression_cache_counts_hits_and_misses():
+    cache = ExpressionCache()
+    expr, f = cache.get("x^2")
+    assert f(3.0) == 9.0
+    assert cache.get("x ^ 2")[1] is f
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+def test_expression_cache_evicts_least_recently_used():
+    cache = ExpressionCache(max_entries=2)
+    cache.get("x+1")
+    cache.get("x+2")
+    cache.get("x+1")
+    cache.get("x+3")
+    assert cache.evictions == 1 and cache.stats()["entries"] == 2
+    cache.get("x+1")
+    assert cache.misses == 3  # still cached
+    cache.get("x+2")
+    assert cache.misses == 4  # evicted as least recently used
+
+def test_expression_cache_skips_entries_over_byte_budget():
+    cache = ExpressionCache(max_bytes=10)
+    expr, f = cache.get("sin(x)")
+    assert f(0.0) == 0.0
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+    # The entry that was just compiled can still be exported, only that one
+    key, expr, source, cost = cache.export_entry("sin(x)")
+    assert key == "sin(x)" and cost > 0
+    cache.get("cos(x)")
+    with pytest.raises(KeyError):
+        cache.export_entry("sin(x)")
+
+def test_expression_cache_replaces_existing_keys_on_import():
+    cache = ExpressionCache()
+    cache.get("x+1")
+    cache.get_field("x*y")
+    size = cache.stats()["bytes"]
+    cache.import_entry(*cache.export_entry("x+1"))
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (2, size)
+    assert list(cache._entries) == ["field:x*y", "x+1"]  # most recently used last
+
+def test_expression_cache_round_trips_through_persist_path(tmp_path):
+    path = str(tmp_path / "cache")
+    cache = ExpressionCache(persist_path=path)
+    cache.get("x^3")
+    cache.save()
+    loaded = ExpressionCache(persist_path=path)
+    assert loaded.get("x^3")[1](2.0) == 8.0
+    assert (loaded.hits, loaded.misses) == (1, 0)
+
+def test_parameters_become_trailing_arguments():
+    expr, f = ExpressionCache().get("b*x + a")
+    assert f(np.array([1.0, 2.0]), 1.0, 10.0).tolist() == [11.0, 21.0]
+
+def test_field_rejects_extra_symbols():
+    with pytest.raises(ValueError):
+        ExpressionCache().get_field("x + z = 1")
+
+def test_expression_cache_persists_equations_as_json(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ExpressionCache(persist_path=path)
+    cache.get("a*x^2")
+    cache.get_field("x^2 + y^2 = 1")
+    cache.save()
+    with open(path) as f:
+        assert json.load(f)["equations"] == ["a*x**2", "field:x**2+y**2=1"]
+    loaded = ExpressionCache(persist_path=path)
+    assert "a*x^2" in loaded
+    assert loaded.get("a*x^2")[1](2.0, 3.0) == 12.0
+    assert loaded.get_field("x^2 + y^2 = 1")[1](1.0, 1.0) == 1.0
+    assert loaded.stats()["misses"] == 0
+
+def test_expression_cache_ignores_foreign_cache_files(tmp_path):
+    path = tmp_path / "cache.json"
+    with open(path, "wb") as f:
+        pickle.dump({"version": 2, "entries": []}, f)
+    assert ExpressionCache(persist_path=str(path)).stats()["entries"] == 0
+    path.write_text(json.dumps({"version": 3, "equations": ["x+", 5, "x+1"]}))
+    cache = ExpressionCache(persist_path=str(path))
+    assert cache.stats()["entries"] == 1 and "x+1" in cache
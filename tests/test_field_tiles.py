@@ -0,0 +1,82 @@
+import numpy as np
+from field_tiles import (TileCache, Tile, evaluate_tile, marching_squares, tile_bounds, visible_tiles,
+                         zoom_level)
+
+UNIT = np.array([0.0, 1.0])
+
+def _edge(point):
+    # Which side of the unit cell a contour point lies on: 0 bottom, 1 right, 2 top, 3 left
+    x, y = point
+    if np.isclose(y, 0):
+        return 0
+    if np.isclose(x, 1):
+        return 1
+    if np.isclose(y, 1):
+        return 2
+    return 3
+
+def _pairs(corners):
+    # corners in marching-squares order: bottom-left, bottom-right, top-right, top-left
+    bl, br, tr, tl = corners
+    segments = marching_squares(UNIT, UNIT, np.array([[bl, br], [tl, tr]], dtype=float))
+    return {tuple(sorted((_edge(a), _edge(b)))) for a, b in segments}
+
+def test_saddle_5_positive_centre_joins_positive_corners():
+    # bottom-left and top-right positive, centre (3 - 1 + 3 - 1) / 4 > 0: cut off the negative corners
+    assert _pairs([3, -1, 3, -1]) == {(0, 1), (2, 3)}
+
+def test_saddle_5_negative_centre_isolates_positive_corners():
+    assert _pairs([1, -3, 1, -3]) == {(0, 3), (1, 2)}
+
+def test_saddle_10_positive_centre_joins_positive_corners():
+    # bottom-right and top-left positive
+    assert _pairs([-1, 3, -1, 3]) == {(0, 3), (1, 2)}
+
+def test_saddle_10_negative_centre_isolates_positive_corners():
+    assert _pairs([-3, 1, -3, 1]) == {(0, 1), (2, 3)}
+
+def test_marching_squares_interpolates_crossing():
+    segments = marching_squares(UNIT, UNIT, np.array([[-1.0, 3.0], [-1.0, 3.0]]))
+    assert segments.shape == (1, 2, 2)
+    assert np.allclose(sorted(segments[0][:, 0]), [0.25, 0.25])
+
+def test_marching_squares_skips_nan_cells():
+    values = np.array([[-1.0, 1.0, np.nan], [-1.0, 1.0, 1.0]])
+    segments = marching_squares(np.arange(3.0), UNIT, values)
+    assert len(segments) == 1
+    assert np.all(segments[:, :, 0] < 1)
+
+def test_marching_squares_unit_circle():
+    xs = ys = np.linspace(-2, 2, 81)
+    values = xs[np.newaxis, :] ** 2 + ys[:, np.newaxis] ** 2 - 1
+    points = marching_squares(xs, ys, values).reshape(-1, 2)
+    assert np.allclose(np.hypot(points[:, 0], points[:, 1]), 1, atol=1e-2)
+
+def test_tiles_cover_view_and_zoom_halves_tile_size():
+    z = zoom_level(4.0, 512)
+    size = tile_bounds(z, 1, 0)[1] - tile_bounds(z, 1, 0)[0]
+    assert size == 2.0
+    assert zoom_level(2.0, 512) == z + 1
+    tiles = visible_tiles((-1.0, 3.0), (0.5, 1.5), z)
+    assert tiles == [(-1, 0), (0, 0), (1, 0)]
+
+def test_neighbouring_tiles_share_edges():
+    f = lambda x, y: x + y
+    left, right = evaluate_tile(f, 0, 0, 0, 8, True), evaluate_tile(f, 0, 1, 0, 8, True)
+    assert left.xs[-1] == right.xs[0]
+    assert np.array_equal(left.values[:, -1], right.values[:, 0])
+
+def test_tile_cache_evicts_least_recently_used_by_bytes():
+    def tile():
+        return Tile(UNIT, UNIT, np.zeros(16), None)  # 128 bytes
+    cache = TileCache(max_bytes=256)
+    cache.put("a", tile())
+    cache.put("b", tile())
+    assert cache.get("a") is not None
+    cache.put("c", tile())
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.evictions == 1
+    assert cache.get("b") is None
+    assert cache.stats()["misses"] == 1
+    cache.put("big", Tile(UNIT, UNIT, np.zeros(64), None))
+    assert "big" not in cache
@@ -0,0 +1,56 @@
+import csv
+import threading
+import pytest
+from history_export import ExportCancelled, available_formats, export_rows, export_store
+from history_store import HistoryStore
+
+def _batches(count, size):
+    for start in range(0, count, size):
+        yield [{"equation": f"x+{i}", "min_x": -1.0, "max_x": 1.0, "color": "#000000", "colorname": "black",
+                "timestamp": "2025-01-01 00:00:00"} for i in range(start, min(start + size, count))]
+
+def test_csv_is_always_available():
+    assert ('CSV', '.csv') in available_formats()
+
+def test_export_rows_streams_batches_with_progress(tmp_path):
+    path = str(tmp_path / "out.csv")
+    seen = []
+    assert export_rows(_batches(25, 10), path, total=25, progress=lambda done, total: seen.append(done)) == 25
+    assert seen == [10, 20, 25]
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 25 and rows[-1]["equation"] == "x+24"
+
+def test_cancel_stops_export_and_removes_partial_file(tmp_path):
+    path = tmp_path / "out.csv"
+    cancel = threading.Event()
+    def progress(done, total):
+        cancel.set()  # cancel after the first batch
+    with pytest.raises(ExportCancelled):
+        export_rows(_batches(100, 10), str(path), progress=progress, cancel=cancel)
+    assert not path.exists()
+
+def test_unsupported_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        export_rows(_batches(1, 1), str(tmp_path / "out.txt"))
+
+def test_export_store_reads_through_its_own_connection(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), legacy_csv_path=None)
+    for batch in _batches(12, 12):
+        for item in batch:
+            store.append(item)
+    store.delete(1)
+    path = str(tmp_path / "out.csv")
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(done=export_store(store, path, batch_size=5)))
+    worker.start()
+    worker.join()
+    assert result["done"] == 11
+    store.conn.close()
+
+@pytest.mark.parametrize("ext,module", [(".xlsx", "openpyxl"), (".parquet", "pyarrow"), (".feather", "pyarrow")])
+def test_optional_formats(tmp_path, ext, module):
+    pytest.importorskip(module)
+    path = tmp_path / ("out" + ext)
+    assert export_rows(_batches(7, 3), str(path)) == 7
+    assert path.stat().st_size > 0
@@ -0,0 +1,31 @@
+from history_store import HistoryIndex
+
+def _items(*rows):
+    return [{"id": i + 1, "equation": equation, "min_x": min_x, "max_x": max_x, "color": "#ff0000",
+             "colorname": "red", "timestamp": timestamp} for i, (equation, timestamp, min_x, max_x) in enumerate(rows)]
+
+def test_history_index_substring_and_prefix_search():
+    index = HistoryIndex(_items(("sin(x)", "", -1, 1), ("x^2", "", -1, 1), ("Sin(2*x)", "", -1, 1),
+                                ("cos(x)", "", -1, 1)))
+    assert index.search("sin") == [1, 3]
+    assert index.search("x", prefix=True) == [2]
+    assert index.search("") == [1, 2, 3, 4]
+
+def test_history_index_range_and_date_filters():
+    items = _items(("a", "2025-01-01 10:00:00", -1, 1), ("b", "2025-01-31 23:59:59", -10, 10),
+                   ("c", "2025-02-01 00:00:00", 0, 5))
+    index = HistoryIndex(items)
+    assert index.search(x_from=-5) == [1, 3]
+    assert index.search(x_to=5) == [1, 3]
+    assert index.search(date_from="2025-01-15", date_to="2025-01-31") == [2]
+    for item in items:
+        assert index.matches(item, x_from=-5) == (item["id"] in (1, 3))
+
+def test_history_index_add_and_remove_keep_order():
+    index = HistoryIndex(_items(("x", "", -1, 1), ("x^2", "", -1, 1)))
+    index.add(dict(_items(("x^3", "", -10, 10))[0], id=5))
+    index.remove(1)
+    assert index.ids() == [2, 5]
+    assert index.search("x", prefix=True) == [2, 5]
+    assert index.search(x_from=-10) == [2, 5]
+    assert len(index) == 2 and index.get(5)["equation"] == "x^3"
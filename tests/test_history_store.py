@@ -0,0 +1,101 @@
+import csv
+import time
+import types
+import pytest
+from history_store import FIELDS, HistoryStore
+
+def _item(equation, timestamp="2025-01-01 00:00:00", min_x=-10.0, max_x=10.0):
+    return {"equation": equation, "min_x": min_x, "max_x": max_x, "color": "#ff0000",
+            "colorname": "red", "timestamp": timestamp}
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), legacy_csv_path=None)
+    yield store
+    store.conn.close()
+
+def test_append_assigns_ids_and_load_all_keeps_order(store):
+    first = store.append(_item("x^2"))
+    second = store.append(_item("sin(x)"))
+    assert second["id"] > first["id"]
+    assert [item["equation"] for item in store.load_all()] == ["x^2", "sin(x)"]
+    assert store.count() == 2
+
+def test_delete_is_a_tombstone_until_compaction(store):
+    keep = store.append(_item("x"))
+    gone = store.append(_item("x^3"))
+    store.delete(gone["id"])
+    assert [item["id"] for item in store.load_all()] == [keep["id"]]
+    assert store.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 2
+    store.maybe_compact()  # half the rows are dead, which meets the default ratio
+    assert store.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 1
+
+def test_find_and_between(store):
+    store.append(_item("x", "2025-01-01 10:00:00"))
+    store.append(_item("x^2", "2025-02-01 10:00:00"))
+    store.append(_item("x", "2025-03-01 10:00:00"))
+    assert len(store.find("x")) == 2
+    assert [i["equation"] for i in store.between("2025-01-15", "2025-02-15")] == ["x^2"]
+
+def test_csv_round_trip_and_reimport_does_not_duplicate(store, tmp_path):
+    store.append(_item("x^2", "2025-01-01 10:00:00"))
+    store.append(_item("cos(x)", "2025-01-01 10:00:05"))
+    path = str(tmp_path / "history.csv")
+    store.export_csv(path)
+    with open(path, newline="") as f:
+        assert next(csv.reader(f)) == FIELDS
+    store.import_csv(path)
+    store.import_csv(path)
+    assert [i["equation"] for i in store.load_all()] == ["x^2", "cos(x)"]
+    store.clear()
+    store.import_csv(path)
+    assert store.count() == 2
+
+def test_legacy_csv_is_migrated_once(tmp_path):
+    legacy = tmp_path / "equation_history.csv"
+    with open(legacy, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["equation", "min_x", "max_x", "color", "timestamp"])
+        writer.writeheader()
+        writer.writerow({"equation": "x", "min_x": -1, "max_x": 1, "color": "#0000ff",
+                         "timestamp": "2024-01-01 00:00:00"})
+    db = str(tmp_path / "history.db")
+    store = HistoryStore(db, legacy_csv_path=str(legacy))
+    items = store.load_all()
+    assert len(items) == 1 and items[0]["colorname"] == "blue"
+    store.clear()
+    store.close()
+    reopened = HistoryStore(db, legacy_csv_path=str(legacy))
+    assert reopened.count() == 0
+    reopened.close()
+
+def test_import_button_merges_csv_and_reloads_the_list(grapher_app, store, tmp_path, monkeypatch):
+    source = HistoryStore(str(tmp_path / "other.db"), legacy_csv_path=None)
+    source.append(_item("x^2"))
+    source.append(_item("tan(x)", "2025-01-02 00:00:00"))
+    path = str(tmp_path / "other.csv")
+    source.export_csv(path)
+    source.conn.close()
+    store.append(_item("x^2"))
+    pending = []
+    app = types.SimpleNamespace(history_store=store, history_loaded=False, messages=[], filtered=0,
+                                root=types.SimpleNamespace(after=lambda ms, fn: pending.append(fn)))
+    App = grapher_app.EquationGrapherApp
+    for name in ("run_in_background", "_read_history", "_history_imported"):
+        setattr(app, name, getattr(App, name).__get__(app))
+    app.show_message = lambda msg, error=False: app.messages.append(msg)
+    app.apply_history_filter = lambda: setattr(app, "filtered", app.filtered + 1)
+    monkeypatch.setattr(grapher_app.filedialog, "askopenfilename", lambda **kw: path)
+    App.import_history(app)
+    while pending:
+        pending.pop(0)()
+        time.sleep(0.005)
+    assert [item["equation"] for item in app.history] == ["x^2", "tan(x)"]
+    assert app.history_index.get(app.history[1]["id"])["equation"] == "tan(x)"
+    assert app.history_loaded and app.filtered == 1
+    assert app.messages[-1] == "Imported history from other.csv"
+
+def test_startup_history_stage_completes_after_an_early_import(grapher_app):
+    app = types.SimpleNamespace(history_loaded=True, stages=[])
+    app._startup_done = app.stages.append
+    grapher_app.EquationGrapherApp._history_loaded(app, ([], None))
+    assert app.stages == ["history"]
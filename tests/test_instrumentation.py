@@ -0,0 +1,45 @@
+import json
+import time
+from instrumentation import Profiler
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.span("plot"):
+        pass
+    profiler.count("points", 10)
+    profiler.frame()
+    assert profiler.recent() == {} and not profiler.counters
+
+def test_spans_report_last_and_mean():
+    profiler = Profiler(history=2)
+    profiler.enabled = True
+    for duration in (1.0, 2.0, 4.0):
+        profiler.add("evaluate", time.perf_counter(), duration)
+    with profiler.span("draw", curves=3):
+        pass
+    last, mean = profiler.recent()["evaluate"]
+    assert last == 4.0 and mean == 3.0  # only the last two samples are kept
+    assert "draw" in profiler.recent()
+
+def test_chrome_trace_export(tmp_path):
+    profiler = Profiler()
+    profiler.enabled = True
+    with profiler.span("sympify", equation="x"):
+        pass
+    profiler.count("points", 129)
+    path = tmp_path / "trace.json"
+    assert profiler.export_chrome_trace(str(path)) == 2
+    events = json.loads(path.read_text())["traceEvents"]
+    assert events[0]["ph"] == "X" and events[0]["args"] == {"equation": "x"}
+    assert events[1]["ph"] == "C" and events[1]["args"] == {"points": 129}
+    profiler.clear()
+    assert profiler.export_chrome_trace(str(path)) == 0
+
+def test_fps_counts_recent_frames():
+    profiler = Profiler()
+    profiler.enabled = True
+    profiler.frame()
+    assert profiler.fps() == 0.0
+    time.sleep(0.02)
+    profiler.frame()
+    assert profiler.fps() > 0
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from grapher_core import ExpressionCache
+from param_frames import FrameCache, evaluate_family, render_animation
+
+def _compiled(equation):
+    return ExpressionCache().get(equation)[1]
+
+def test_evaluate_family_broadcasts_one_parameter():
+    f = _compiled("a*x + b")  # f(x, a, b)
+    x = np.linspace(0, 1, 5)
+    out = evaluate_family(f, x, [1.0, 2.0, 3.0], index=0, fixed=(10.0,))
+    assert out.shape == (3, 5)
+    assert np.allclose(out, np.array([1, 2, 3])[:, None] * x + 10)
+    out = evaluate_family(f, x, [0.0, 1.0], index=1, fixed=(2.0,), max_cells=5)  # one row per block
+    assert np.allclose(out, [2 * x, 2 * x + 1])
+
+def test_evaluate_family_masks_complex_rows():
+    out = evaluate_family(_compiled("sqrt(a*x)"), np.array([1.0, 4.0]), [-1.0, 1.0])
+    assert np.isnan(out[0]).all() and np.allclose(out[1], [1, 2])
+
+def test_sweep_only_evaluates_missing_frames():
+    f = _compiled("a*sin(b*x)")
+    x = np.linspace(0, 1, 8)
+    cache = FrameCache()
+    params = {"a": 1.0, "b": 2.0}
+    frames = cache.sweep(("eq", 0, 1, 8), f, x, params, "a", [0.5, 1.0])
+    assert np.allclose(frames[1], np.sin(2 * x))
+    cache.sweep(("eq", 0, 1, 8), f, x, params, "a", [1.0, 1.5])
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert np.allclose(cache.frame(("eq", 0, 1, 8), {"a": 1.5, "b": 2.0}, "a"), 1.5 * np.sin(2 * x))
+    # Changing the other parameter is a different sweep
+    assert cache.frame(("eq", 0, 1, 8), {"a": 1.5, "b": 3.0}, "a") is None
+
+def test_frame_cache_evicts_by_bytes():
+    cache = FrameCache(max_bytes=160)
+    for i in range(3):
+        cache.put(i, np.zeros(10))  # 80 bytes each
+    assert len(cache) == 2 and cache.get(0) is None and cache.evictions == 1
+
+def test_render_animation_writes_gif(tmp_path):
+    x = np.linspace(0, 1, 20)
+    frames = [x * v for v in (1.0, 2.0, 3.0)]
+    path = tmp_path / "sweep.gif"
+    assert render_animation(x, frames, [1.0, 2.0, 3.0], "a", str(path), "#ff0000", label="a*x", fps=5,
+                            figsize=(2, 2), dpi=40) == 3
+    assert path.read_bytes()[:3] == b"GIF"
+    with pytest.raises(ValueError):
+        render_animation(x, frames, [1.0, 2.0, 3.0], "a", str(tmp_path / "sweep.avi"), "#ff0000")
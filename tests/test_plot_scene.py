@@ -0,0 +1,39 @@
+import numpy as np
+from matplotlib.figure import Figure
+from plot_scene import PlotScene
+
+def _scene(dark=True):
+    fig = Figure()
+    return PlotScene(fig, fig.add_subplot(), dark=dark)
+
+def test_add_replaces_curve_with_same_equation():
+    scene = _scene()
+    x = np.linspace(0, 1, 50)
+    first = scene.add("x", None, x, x, "#ff0000", 400)
+    second = scene.add("x", None, x, 2 * x, "#00ff00", 400)
+    assert first is second and len(scene) == 1
+    assert np.allclose(second.line.get_ydata(), 2 * x)
+    assert second.line.get_color() == "#00ff00"
+
+def test_set_theme_keeps_lines_and_limits():
+    scene = _scene()
+    x = np.linspace(0, 10, 50)
+    curve = scene.add("x", None, x, x, "#ff0000", 400)
+    limits = scene.ax.get_xlim(), scene.ax.get_ylim()
+    scene.set_theme(False)
+    assert curve.line in scene.ax.lines
+    assert (scene.ax.get_xlim(), scene.ax.get_ylim()) == limits
+    assert scene.ax.get_facecolor()[:3] != (7 / 255, 20 / 255, 40 / 255)
+
+def test_clear_resets_extents_and_zoom():
+    scene = _scene()
+    x = np.linspace(-100, 100, 50)
+    scene.add("x^3", None, x, x ** 3, "#ff0000", 400)
+    scene.ax.set_xlim(-3, 3)  # zoomed in, which turns x autoscaling off
+    scene.clear()
+    assert not scene.ax.lines and scene.ax.get_legend() is None
+    x = np.linspace(0, 1, 50)
+    scene.add("x", None, x, x, "#00ff00", 400)
+    lo, hi = scene.ax.get_xlim()
+    assert lo > -0.5 and hi < 1.5
+    assert scene.ax.get_ylim()[1] < 2
@@ -0,0 +1,61 @@
+import os
+import sys
+import glob
+import time
+import types
+import sqlite3
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_modules_import_without_sympy_or_matplotlib():
+    # The GUI imports its modules before the window is painted; sympy and matplotlib load later
+    modules = sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(ROOT, "*.py"))
+                     if " " not in os.path.basename(p))
+    code = (f"import sys, {', '.join(modules)}; "
+            "print(sorted(m for m in ('sympy', 'matplotlib') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+def test_read_persisted_warms_up_without_a_cache_file(tmp_path):
+    from grapher_core import ExpressionCache
+    cache = ExpressionCache(persist_path=str(tmp_path / "missing.json"), load=False)
+    assert cache.read_persisted() == []
+    assert cache.stats()["entries"] == 0
+
+class _Root:
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn):
+        self.pending.append(fn)
+
+    def run_until_idle(self, limit=5.0):
+        deadline = time.monotonic() + limit
+        while self.pending and time.monotonic() < deadline:
+            self.pending.pop(0)()
+            time.sleep(0.005)
+
+def test_background_failures_reach_the_tk_thread(grapher_app):
+    app = types.SimpleNamespace(root=_Root(), messages=[])
+    app.show_message = lambda msg, error=False: app.messages.append((msg, error))
+    run = grapher_app.EquationGrapherApp.run_in_background
+    done, failed = [], []
+    def work():
+        raise OSError("disk gone")
+    run(app, work, done.append, failed.append)
+    run(app, lambda: 42, done.append, failed.append)
+    run(app, work, done.append)
+    app.root.run_until_idle()
+    assert done == [42]
+    assert [str(e) for e in failed] == ["disk gone"]
+    assert app.messages == [("Background task failed: disk gone", True)]
+
+def test_startup_finishes_when_history_cannot_be_read(grapher_app):
+    app = types.SimpleNamespace(history_loaded=False, messages=[], stages=[])
+    app.show_message = lambda msg, error=False: app.messages.append(msg)
+    app._startup_done = app.stages.append
+    grapher_app.EquationGrapherApp._history_failed(app, sqlite3.DatabaseError("file is not a database"))
+    grapher_app.EquationGrapherApp._sympy_failed(app, ImportError("no sympy"))
+    assert app.history_loaded and app.stages == ["history", "sympy"]
+    assert app.messages[0] == "Could not load history: file is not a database"
@@ -0,0 +1,65 @@
+import time
+import numpy as np
+
+class FakeRoot:
+    # Stands in for Tk's after()/after_cancel() so the resampler runs without a display
+    def __init__(self):
+        self.jobs = {}
+        self._next = 0
+
+    def after(self, ms, fn):
+        self._next += 1
+        self.jobs[self._next] = fn
+        return self._next
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, {}
+        for fn in jobs.values():
+            fn()
+
+def _run_until(root, condition, limit=10.0):
+    deadline = time.monotonic() + limit
+    while not condition() and time.monotonic() < deadline:
+        root.run_pending()
+        time.sleep(0.01)
+    return condition()
+
+def test_requests_are_debounced_and_sampled_for_the_view(grapher_app):
+    root = FakeRoot()
+    delivered = []
+    resampler = grapher_app.ViewportResampler(root, delivered.append)
+    resampler.request([("a", np.sin)], (-100.0, 100.0), 500)
+    resampler.request([("a", np.sin), ("b", np.cos)], (0.0, 1.0), 500)
+    assert _run_until(root, lambda: delivered)
+    results = delivered[0]
+    assert set(results) == {"a", "b"}
+    x, y = results["a"]
+    assert x[0] == 0.0 and x[-1] == 1.0
+    assert np.allclose(y[np.isfinite(y)], np.sin(x[np.isfinite(y)]))
+    root.run_pending()
+    assert len(delivered) == 1
+
+def test_cancel_drops_pending_results(grapher_app):
+    root = FakeRoot()
+    delivered = []
+    resampler = grapher_app.ViewportResampler(root, delivered.append)
+    resampler.request([("a", np.sin)], (0.0, 1.0), 500)
+    resampler.cancel()
+    _run_until(root, lambda: delivered, limit=0.5)
+    assert not delivered
+
+def test_requests_pass_their_tolerance_to_the_sampler(grapher_app, monkeypatch):
+    calls = []
+    def sampler(f, x0, x1, tol=None, max_points=None, stats=None):
+        calls.append((tol, max_points))
+        return np.array([x0, x1]), np.array([0.0, 0.0])
+    monkeypatch.setattr(grapher_app, "adaptive_sample", sampler)
+    root = FakeRoot()
+    delivered = []
+    resampler = grapher_app.ViewportResampler(root, delivered.append)
+    resampler.request([("a", np.sin)], (0.0, 1.0), 1234, tol=0.05)
+    assert _run_until(root, lambda: delivered)
+    assert calls == [(0.05, 1234)]